@@ -0,0 +1,58 @@
+"""
+Compares the JSON codecs on payloads like those of a large domain.
+
+Run it with python 3 from the root of the repository:
+
+    python -m benchmarks.codecs --servers 200 --properties 200
+"""
+import argparse
+import json
+import timeit
+
+from benchmarks.fake_server import BASE_PATH, FakeWLSServer
+from wls_rest_python import WLSCodec
+
+
+def payloads(servers, properties):
+    """Returns the encoded payloads to decode, by name"""
+    server = FakeWLSServer(servers=servers, properties=properties)
+    url = "https://wls.example.com:7001" + BASE_PATH + "/domainRuntime/serverRuntimes"
+    runtimes = server.root.children["domainRuntime"].children["serverRuntimes"]
+    collection = server._render(runtimes, url, {})
+    return [
+        ("serverRuntimes", json.dumps(collection).encode("utf-8")),
+        ("serverRuntime", json.dumps(collection["items"][0]).encode("utf-8")),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--servers", type=int, default=100)
+    parser.add_argument("--properties", type=int, default=200)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    codecs = []
+    for name in ("json", "ujson", "orjson"):
+        try:
+            codecs.append(WLSCodec(name))
+        except ImportError:
+            print("{:<8} not installed".format(name))
+
+    for payload, body in payloads(args.servers, args.properties):
+        decoded = json.loads(body.decode("utf-8"))
+        print("{} ({} bytes)".format(payload, len(body)))
+        for codec in codecs:
+            loads = timeit.timeit(lambda: codec.loads(body), number=args.number)
+            dumps = timeit.timeit(lambda: codec.dumps(decoded), number=args.number)
+            print(
+                "  {:<8} loads {:>8.3f} ms   dumps {:>8.3f} ms".format(
+                    codec.name,
+                    loads / args.number * 1000,
+                    dumps / args.number * 1000,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+A stand-in for the Weblogic Server REST API, for benchmarks and tests.
+
+Serves an edit and a domainRuntime tree for a generated domain, over
+local HTTP, with a configurable latency. Supports the fields, excludeFields
+and links query parameters, search, actions and asynchronous jobs:
+
+    with FakeWLSServer(servers=50, applications=10) as server:
+        wls = WLS(server.url, "weblogic", "welcome1")
+"""
+import itertools
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+BASE_PATH = "/management/weblogic/latest"
+
+
+class Node(object):
+    """
+    An object in the tree, with properties, children and actions.
+
+    If items is not None, it is a collection of other nodes.
+    """
+
+    def __init__(self, properties=None, children=None, actions=(), items=None):
+        self.properties = properties or {}
+        self.children = children or OrderedDict()
+        self.actions = actions
+        self.items = items
+
+
+def _padding(count):
+    # runtime objects have many properties, which makes up most of the payload
+    return OrderedDict(("property{}".format(i), i * 1000) for i in range(count))
+
+
+def build_domain(servers=10, applications=5, properties=20):
+    """
+    Builds the tree of a domain, with an admin server
+    and managed servers, and the applications deployed to all of them.
+    """
+    names = ["AdminServer"] + ["ms{}".format(i) for i in range(1, servers + 1)]
+    apps = ["app{}".format(i) for i in range(1, applications + 1)]
+
+    def collection(items):
+        return Node(items=OrderedDict(items))
+
+    def server_runtime(name):
+        runtime = Node(
+            OrderedDict(
+                [("name", name), ("state", "RUNNING"), ("healthState", {"state": "ok"})]
+            ),
+            actions=("shutdown", "suspend", "resume"),
+        )
+        runtime.properties.update(_padding(properties))
+        runtime.children["JVMRuntime"] = Node(
+            OrderedDict([("name", name), ("heapFreeCurrent", 536870912)])
+        )
+        runtime.children["threadPoolRuntime"] = Node(
+            OrderedDict([("name", "ThreadPoolRuntime"), ("hoggingThreadCount", 0)])
+        )
+        runtime.children["applicationRuntimes"] = collection(
+            (app, Node(OrderedDict([("name", app), ("healthState", {"state": "ok"})])))
+            for app in apps
+        )
+        return runtime
+
+    edit = Node(OrderedDict([("name", "mydomain"), ("adminServerName", "AdminServer")]))
+    edit.children["servers"] = collection(
+        (
+            name,
+            Node(
+                OrderedDict(
+                    [
+                        ("name", name),
+                        ("listenPort", 7001 + i),
+                        ("nativeIOEnabled", True),
+                    ]
+                    + list(_padding(properties).items())
+                ),
+                children=OrderedDict(
+                    [("SSL", Node(OrderedDict([("name", name), ("enabled", False)])))]
+                ),
+            ),
+        )
+        for i, name in enumerate(names)
+    )
+    edit.children["appDeployments"] = collection(
+        (app, Node(OrderedDict([("name", app), ("sourcePath", "/apps/" + app)])))
+        for app in apps
+    )
+
+    domain_runtime = Node(OrderedDict([("name", "mydomain")]))
+    domain_runtime.children["serverRuntimes"] = collection(
+        (name, server_runtime(name)) for name in names
+    )
+    domain_runtime.children["serverLifeCycleRuntimes"] = collection(
+        (
+            name,
+            Node(
+                OrderedDict([("name", name), ("state", "RUNNING")]),
+                actions=("start", "shutdown"),
+            ),
+        )
+        for name in names
+    )
+
+    root = Node(
+        OrderedDict(
+            [("version", "12.2.1.3.0"), ("isLatest", True), ("lifecycle", "active")]
+        )
+    )
+    root.children["edit"] = edit
+    root.children["domainRuntime"] = domain_runtime
+    return root
+
+
+def _names(params, key):
+    if key not in params:
+        return None
+    return [name for value in params[key] for name in value.split(",") if name]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # the headers and the body are written separately
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method):
+        server = self.server.fake
+        split = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server._count(method, split.path)
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            status, response = self._respond(server, method, split, body)
+        finally:
+            # done before the response is sent, as the client
+            # may send the next request as soon as it is received
+            server._done()
+        self._send(status, response)
+
+    def _respond(self, server, method, split, body):
+        if self.headers.get("Authorization") is None:
+            return 401, None
+        try:
+            return server.handle(
+                method,
+                split.path,
+                parse_qs(split.query),
+                body,
+                self.headers.get("Prefer") == "respond-async",
+            )
+        except KeyError:
+            return 404, {"status": 404, "detail": "Not found"}
+
+    def _send(self, status, response):
+        body = b"" if response is None else json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class FakeWLSServer(object):
+    """
+    Serves a generated domain on a local port, until stopped.
+
+    :param int servers: Number of managed servers, in addition to the admin server.
+    :param int applications: Number of applications.
+    :param int properties: Number of extra properties of each server,
+        to make the payloads realistically large.
+    :param float latency: Seconds to wait before answering each request.
+    :param int job_polls: Number of times a job must be fetched before
+        it is completed.
+    """
+
+    def __init__(
+        self, servers=10, applications=5, properties=20, latency=0.0, job_polls=2
+    ):
+        self.root = build_domain(servers, applications, properties)
+        self.latency = latency
+        self.job_polls = job_polls
+        self.requests = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.url = None
+        self._jobs = {}
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Starts serving in a background thread, and returns the URL"""
+        self._httpd = _ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.fake = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        self.url = "http://127.0.0.1:{}".format(self._httpd.server_port)
+        return self.url
+
+    def stop(self):
+        """Stops serving"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def reset(self):
+        """Clears the request counts"""
+        with self._lock:
+            self.requests.clear()
+            self.max_in_flight = self.in_flight
+
+    def _count(self, method, path):
+        with self._lock:
+            self.requests[(method, path)] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _done(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def handle(self, method, path, params, body, prefer_async):
+        """Returns the status and the response for a request"""
+        if not path.startswith(BASE_PATH):
+            raise KeyError(path)
+        segments = [unquote(s) for s in path[len(BASE_PATH) :].split("/") if s]
+        if segments[-2:-1] == ["jobs"]:
+            return self._job(segments[-1])
+
+        if method == "POST" and segments and segments[-1] == "search":
+            node = self._find(segments[:-1])
+            url = self._url(segments[:-1])
+            return 200, self._search(node, url, json.loads(body.decode("utf-8")))
+
+        try:
+            node = self._find(segments)
+        except KeyError:
+            parent = self._find(segments[:-1])
+            if method != "POST" or segments[-1] not in parent.actions:
+                raise
+            return self._action(segments, prefer_async)
+
+        url = self._url(segments)
+        if method == "GET":
+            return 200, self._render(node, url, params)
+        if method == "DELETE":
+            parent = self._find(segments[:-1])
+            if parent.items is None:
+                raise KeyError(path)
+            del parent.items[segments[-1]]
+            return 200, {}
+        if node.items is not None:
+            return 201, {}
+        node.properties.update(json.loads(body.decode("utf-8") or "{}"))
+        return 200, {}
+
+    def _find(self, segments):
+        node = self.root
+        for segment in segments:
+            if node.items is not None:
+                node = node.items[segment]
+            else:
+                node = node.children[segment]
+        return node
+
+    def _url(self, segments):
+        return self.url + BASE_PATH + "".join("/" + quote(s, safe="") for s in segments)
+
+    def _action(self, segments, prefer_async):
+        with self._lock:
+            job_id = str(next(self._job_ids))
+            self._jobs[job_id] = 0 if prefer_async else self.job_polls
+        job = self._job(job_id)[1]
+        return (202 if prefer_async else 200), job
+
+    def _job(self, job_id):
+        with self._lock:
+            polls = self._jobs[job_id]
+            self._jobs[job_id] = polls + 1
+        completed = polls >= self.job_polls
+        href = "{}{}/jobs/{}".format(self.url, BASE_PATH, job_id)
+        return 200, {
+            "name": "_{}_action".format(job_id),
+            "completed": completed,
+            "progress": "success" if completed else "processing",
+            "links": [{"rel": "job", "href": href}, {"rel": "self", "href": href}],
+        }
+
+    def _properties(self, node, params):
+        fields = _names(params, "fields")
+        excluded = _names(params, "excludeFields") or ()
+        return OrderedDict(
+            (key, value)
+            for key, value in node.properties.items()
+            if (fields is None or key in fields) and key not in excluded
+        )
+
+    def _links(self, node, url, params):
+        links = _names(params, "links")
+        if links == ["none"]:
+            return None
+        excluded = _names(params, "excludeLinks") or ()
+        result = [{"rel": "self", "href": url}]
+        result += [
+            {"rel": name, "href": "{}/{}".format(url, name)} for name in node.children
+        ]
+        result += [
+            {"rel": "action", "title": name, "href": "{}/{}".format(url, name)}
+            for name in node.actions
+        ]
+        return [
+            link
+            for link in result
+            if (links is None or link.get("title", link["rel"]) in links)
+            and link.get("title", link["rel"]) not in excluded
+        ]
+
+    def _render(self, node, url, params, item=False):
+        if node.items is not None:
+            collection = {
+                "items": [
+                    self._render(
+                        child, "{}/{}".format(url, quote(name, safe="")), params, True
+                    )
+                    for name, child in node.items.items()
+                ]
+            }
+        else:
+            collection = self._properties(node, params)
+        links = self._links(node, url, params)
+        if links is not None:
+            # items only have their self link
+            collection["links"] = links[:1] if item else links
+        return collection
+
+    def _search(self, node, url, query):
+        params = {}
+        for key in ("fields", "links"):
+            if key in query:
+                params[key] = [",".join(query[key]) or "none"]
+        if node.items is not None:
+            collection = {
+                "items": [
+                    self._search(
+                        child, "{}/{}".format(url, quote(name, safe="")), query
+                    )
+                    for name, child in node.items.items()
+                ]
+            }
+        else:
+            collection = self._properties(node, params)
+            for name, child_query in query.get("children", {}).items():
+                if name in node.children:
+                    collection[name] = self._search(
+                        node.children[name], "{}/{}".format(url, name), child_query
+                    )
+        links = self._links(node, url, params)
+        if links is not None:
+            collection["links"] = links
+        return collection
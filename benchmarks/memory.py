@@ -0,0 +1,97 @@
+"""
+Measures the memory used per object when crawling a large domain.
+
+The collections are generated in memory, so only the objects of
+wls_rest_python are measured, not the HTTP requests. Run it with
+python 3 from the root of the repository:
+
+    python -m benchmarks.memory --servers 20000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from wls_rest_python import WLSObject
+
+BASE_URL = "https://wls.example.com:7001/management/weblogic/latest"
+
+LINKS = ("JVMRuntime", "threadPoolRuntime", "serverChannelRuntimes")
+ACTIONS = ("start", "shutdown", "suspend")
+
+
+class StaticWLS(object):
+    """Serves generated collections for a domain of the given size"""
+
+    def __init__(self, servers):
+        self.servers = servers
+
+    def get(self, url, **kwargs):
+        path = url[len(BASE_URL) :]
+        if path == "/domainRuntime/serverRuntimes":
+            return {
+                "items": [
+                    {
+                        "name": "ms{}".format(i),
+                        "state": "RUNNING",
+                        "links": [{"rel": "self", "href": "{}/ms{}".format(url, i)}],
+                    }
+                    for i in range(self.servers)
+                ]
+            }
+        links = [{"rel": rel, "href": "{}/{}".format(url, rel)} for rel in LINKS]
+        links += [
+            {"rel": "action", "title": name, "href": "{}/{}".format(url, name)}
+            for name in ACTIONS
+        ]
+        return {"name": path.rsplit("/", 1)[-1], "state": "RUNNING", "links": links}
+
+
+def measure(crawl, wls):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = crawl(wls)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return len(kept), used
+
+
+def crawl_items(wls):
+    runtimes = WLSObject(
+        "serverRuntimes", BASE_URL + "/domainRuntime/serverRuntimes", wls
+    )
+    return list(runtimes)
+
+
+def crawl_links(wls):
+    kept = []
+    for i in range(wls.servers):
+        server = WLSObject(
+            "ms{}".format(i),
+            "{}/domainRuntime/serverRuntimes/ms{}".format(BASE_URL, i),
+            wls,
+        )
+        kept.append(server)
+        kept.extend(getattr(server, rel) for rel in LINKS)
+        kept.extend(getattr(server, name) for name in ACTIONS)
+    return kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--servers", type=int, default=10000)
+    args = parser.parse_args()
+
+    wls = StaticWLS(args.servers)
+    for name, crawl in (("items", crawl_items), ("links", crawl_links)):
+        count, used = measure(crawl, wls)
+        print(
+            "{:<6} {:>8} objects {:>12} bytes {:>8.1f} bytes/object".format(
+                name, count, used, used / count
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
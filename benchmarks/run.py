@@ -0,0 +1,130 @@
+"""
+Runs typical access patterns against the stand-in server, and reports
+the number of requests, the time and the peak memory of each.
+
+Run it with python 3 from the root of the repository:
+
+    python -m benchmarks.run --servers 50 --latency 0.005
+
+The results can be saved with --save, and compared with a later run
+with --baseline, which fails if a scenario sends more requests than before.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from benchmarks.fake_server import FakeWLSServer
+from wls_rest_python import WLS
+
+
+def attribute_chain(wls):
+    """Reads a property through a chain of attributes, for each server"""
+    for server in wls.edit.servers:
+        wls.domainRuntime.serverRuntimes[server._name].JVMRuntime.heapFreeCurrent
+
+
+def iteration(wls):
+    """Reads a property of each item of a collection"""
+    return [server.state for server in wls.domainRuntime.serverRuntimes]
+
+
+def dir_items(wls):
+    """Lists the attributes of each item of a collection"""
+    return [dir(server) for server in wls.edit.servers]
+
+
+def action_fanout(wls):
+    """Invokes an action on each item of a collection, concurrently"""
+    return iter(wls.domainRuntime.serverLifeCycleRuntimes).invoke("start")
+
+
+def job_polling(wls):
+    """Invokes an action on each item asynchronously, and waits for the jobs"""
+    jobs = [
+        server.start(prefer_async=True)
+        for server in wls.domainRuntime.serverLifeCycleRuntimes
+    ]
+    return list(wls.wait_for_jobs(jobs, poll=0.01))
+
+
+SCENARIOS = OrderedDict(
+    (fn.__name__, fn)
+    for fn in (attribute_chain, iteration, dir_items, action_fanout, job_polling)
+)
+
+
+def run(server, scenario, **kwargs):
+    """
+    Runs a scenario with a new client, and returns a dict with the number
+    of requests, the seconds it took and the peak of allocated bytes.
+    """
+    wls = WLS(server.url, "weblogic", "welcome1", metrics=True, **kwargs)
+    wls.metrics.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        SCENARIOS[scenario](wls)
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        wls.session.close()
+    return {
+        "requests": sum(stats["count"] for stats in wls.metrics.summary()),
+        "seconds": elapsed,
+        "peak_bytes": peak,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--servers", type=int, default=20)
+    parser.add_argument("--applications", type=int, default=5)
+    parser.add_argument("--properties", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--save", help="Save the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare with results saved earlier")
+    args = parser.parse_args(argv)
+
+    results = OrderedDict()
+    with FakeWLSServer(
+        servers=args.servers,
+        applications=args.applications,
+        properties=args.properties,
+        latency=args.latency,
+    ) as server:
+        for scenario in args.scenario or SCENARIOS:
+            results[scenario] = run(server, scenario)
+            print(
+                "{:<16} {:>6} requests {:>8.3f} s {:>12} peak bytes".format(
+                    scenario, *results[scenario].values()
+                )
+            )
+
+    if args.save:
+        with open(args.save, "w") as fileobj:
+            json.dump(results, fileobj, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fileobj:
+            baseline = json.load(fileobj)
+        regressions = [
+            "{}: {} requests, was {}".format(
+                scenario, result["requests"], baseline[scenario]["requests"]
+            )
+            for scenario, result in results.items()
+            if scenario in baseline
+            and result["requests"] > baseline[scenario]["requests"]
+        ]
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 5):
+    # async/await is a syntax error on older pythons
+    collect_ignore.append("test_wls_rest_python_async.py")
+if sys.version_info < (3,):
+    # the stand-in server used by the benchmarks is python 3 only
+    collect_ignore.append("test_benchmarks.py")
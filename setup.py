@@ -29,10 +29,16 @@ setup(
     author='Magnus Watn',
     keywords='weblogic wls rest administration automation',
     url='https://github.com/magnuswatn/wls-rest-python',
-    py_modules=['wls_rest_python'],
+    py_modules=['wls_rest_python', 'wls_rest_python_async'],
     install_requires=[
         'requests',
+        'futures; python_version < "3"',
         ],
+    extras_require={
+        'async': ['aiohttp>=3.3'],
+        'streaming': ['ijson>=3.1'],
+        'orjson': ['orjson>=3; python_version >= "3.6"'],
+        },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import wls_rest_python
+from benchmarks import codecs, run
+from benchmarks.fake_server import FakeWLSServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeWLSServer(servers=3, applications=2, properties=5, job_polls=1) as server:
+        yield server
+
+
+@pytest.fixture
+def wls(server):
+    wls = wls_rest_python.WLS(server.url, "weblogic", "welcome1")
+    yield wls
+    wls.session.close()
+
+
+def test_fake_server_tree(wls):
+    assert wls.version == "12.2.1.3.0"
+    assert wls.edit.adminServerName == "AdminServer"
+    assert [server.name for server in wls.edit.servers] == [
+        "AdminServer",
+        "ms1",
+        "ms2",
+        "ms3",
+    ]
+    runtime = wls.domainRuntime.serverRuntimes.ms1
+    assert runtime.JVMRuntime.heapFreeCurrent == 536870912
+    assert len(runtime.applicationRuntimes) == 2
+    assert "shutdown" in dir(runtime)
+    with pytest.raises(wls_rest_python.NotFoundException):
+        wls.get(wls.base_url + "/domainRuntime/nothing")
+
+
+def test_fake_server_projection(wls):
+    url = wls.base_url + "/domainRuntime/serverRuntimes/ms1"
+    assert wls.get(url, params={"fields": "state", "links": "none"}) == {
+        "state": "RUNNING"
+    }
+    result = wls.get(url, params={"fields": "name", "excludeLinks": "self"})
+    assert result["name"] == "ms1"
+    assert "self" not in [link["rel"] for link in result["links"]]
+
+
+def test_fake_server_projected_reads(server):
+    wls = wls_rest_python.WLS(server.url, "weblogic", "welcome1", projected_reads=True)
+    server.reset()
+    assert wls.edit.servers.ms1.SSL.enabled is False
+    wls.close()
+    # one request per hop, each limited to the attribute
+    assert sum(server.requests.values()) == 4
+
+
+def test_fake_server_search(wls):
+    result = wls.search(
+        {
+            "fields": [],
+            "links": [],
+            "children": {
+                "serverRuntimes": {
+                    "fields": ["name", "state"],
+                    "links": [],
+                    "children": {"JVMRuntime": {"fields": ["heapFreeCurrent"]}},
+                }
+            },
+        }
+    )
+    servers = list(result.serverRuntimes)
+    assert servers[1].state == "RUNNING"
+    assert servers[1].JVMRuntime.heapFreeCurrent == 536870912
+
+
+def test_fake_server_jobs(server, wls):
+    server.reset()
+    job = wls.domainRuntime.serverLifeCycleRuntimes.ms2.start(prefer_async=True)
+    assert [job.completed for job in wls.wait_for_jobs([job], poll=0.01)] == [True]
+    posts = [key for key in server.requests if key[0] == "POST"]
+    assert [path.rsplit("/", 2)[1:] for _, path in posts] == [["ms2", "start"]]
+
+
+@pytest.mark.parametrize("scenario", list(run.SCENARIOS))
+def test_benchmark_scenarios(server, scenario):
+    result = run.run(server, scenario)
+    assert result["requests"] > 0
+    assert result["seconds"] > 0
+    assert result["peak_bytes"] > 0
+
+
+def test_benchmark_baseline(tmpdir):
+    saved = str(tmpdir.join("results.json"))
+    argv = ["--servers", "2", "--scenario", "iteration"]
+    assert run.main(argv + ["--save", saved]) == 0
+    assert run.main(argv + ["--baseline", saved]) == 0
+
+
+def test_fake_server_coalesced_gets():
+    with FakeWLSServer(servers=3, latency=0.3) as server:
+        wls = wls_rest_python.WLS(server.url, "weblogic", "welcome1")
+        url = wls.base_url + "/domainRuntime/serverRuntimes"
+        server.reset()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: wls.get(url), range(8)))
+        wls.session.close()
+    assert all(result == results[0] for result in results)
+    # the requests made while the first is in flight are coalesced
+    assert sum(server.requests.values()) == 1
+
+
+def test_fake_server_thread_safe_stress():
+    with FakeWLSServer(servers=10, applications=3, job_polls=1) as server:
+        metrics = wls_rest_python.WLSMetrics()
+        wls = wls_rest_python.WLS(
+            server.url,
+            "weblogic",
+            "welcome1",
+            thread_safe=True,
+            cache_ttl=0.01,
+            link_templates=True,
+            metrics=metrics,
+            pool_maxsize=4,
+        )
+        metrics.reset()
+        server.reset()
+        runtimes = wls.domainRuntime.serverRuntimes
+
+        def work(i):
+            server = runtimes["ms{}".format(i % 10 + 1)]
+            return (
+                server.name,
+                server.JVMRuntime.heapFreeCurrent,
+                len(server.applicationRuntimes),
+                sorted(app.name for app in server.applicationRuntimes),
+                wls.edit.servers["ms{}".format(i % 10 + 1)].SSL.enabled,
+            )
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(work, range(400)))
+            jobs = list(
+                executor.map(
+                    lambda item: item.start(prefer_async=True),
+                    wls.domainRuntime.serverLifeCycleRuntimes,
+                )
+            )
+        completed = list(wls.wait_for_jobs(jobs, poll=0.01))
+        wls.close()
+
+    for i, result in enumerate(results):
+        assert result == (
+            "ms{}".format(i % 10 + 1),
+            536870912,
+            3,
+            ["app1", "app2", "app3"],
+            False,
+        )
+    assert len(completed) == 11
+    assert all(job.completed for job in completed)
+    # every request sent was recorded, so none were lost between the threads
+    assert sum(x["count"] for x in metrics.summary()) == sum(server.requests.values())
+
+
+def test_fake_server_limiter():
+    with FakeWLSServer(servers=3, latency=0.05) as server:
+        limiter = wls_rest_python.WLSLimiter(max_in_flight=2)
+        # the clients of a fleet share the limiter
+        clients = [
+            wls_rest_python.WLS(
+                server.url, "weblogic", "welcome1", limiter=limiter, coalesce=False
+            )
+            for _ in range(2)
+        ]
+        url = clients[0].base_url + "/domainRuntime/serverRuntimes"
+        server.reset()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: clients[i % 2].get(url), range(16)))
+        for wls in clients:
+            wls.close()
+    assert sum(server.requests.values()) == 16
+    assert server.max_in_flight == 2
+    assert limiter.in_flight == 0
+    assert limiter.waits > 0
+    assert limiter.max_wait >= 0.04
+
+
+def test_benchmark_codecs(capsys):
+    codecs.main(["--servers", "2", "--properties", "5", "--number", "1"])
+    output = capsys.readouterr().out
+    assert "serverRuntimes (" in output
+    assert "  json     loads" in output
+
+
+def test_fake_server_snapshot(server, wls):
+    server.reset()
+    snapshot = wls.snapshot(wls.domainRuntime, depth=3)
+    requests = sum(server.requests.values())
+    # the tree, the collections, the servers and their children
+    assert requests == 1 + 2 + 8 + 12
+    assert [
+        runtime.JVMRuntime.heapFreeCurrent for runtime in snapshot.serverRuntimes
+    ] == [536870912] * 4
+    assert snapshot.serverLifeCycleRuntimes.ms2.state == "RUNNING"
+    assert len(snapshot.serverRuntimes.ms3.applicationRuntimes) == 2
+    assert sum(server.requests.values()) == requests
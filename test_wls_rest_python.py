@@ -9,7 +9,14 @@ except ImportError:
     # python2
     from mock import MagicMock
 
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+import requests
 import requests_mock
 
 import wls_rest_python
@@ -128,9 +135,298 @@ def test_wls_repr():
     )
 
 
+def test_wls_init_pool_and_retries():
+    collection = {
+        "version": "12.2.1.3",
+        "isLatest": True,
+        "lifecycle": "active",
+        "links": [],
+    }
+    with requests_mock.mock() as r:
+        r.get(
+            "https://wls.example.com:7001/management/weblogic/latest", json=collection
+        )
+        wls = wls_rest_python.WLS(
+            "https://wls.example.com:7001",
+            "weblogic",
+            "Welcome1",
+            timeout=60,
+            connect_timeout=5,
+            pool_maxsize=40,
+            retries=3,
+            retry_backoff=1,
+        )
+    assert wls.timeout == (5, 60)
+    adapter = wls.session.get_adapter("https://wls.example.com:7001")
+    assert adapter._pool_maxsize == 40
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.backoff_factor == 1
+
+
+def test_wls_retry():
+    retry = wls_rest_python._retry(2, 0.5)
+    assert retry.total == 2
+    assert retry.raise_on_status is False
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("POST", 503)
+    assert not retry.is_retry("GET", 500)
+
+
+def test_wls_init_metrics():
+    collection = {
+        "version": "12.2.1.3",
+        "isLatest": True,
+        "lifecycle": "active",
+        "links": [],
+    }
+    with requests_mock.mock() as r:
+        r.get(
+            "https://wls.example.com:7001/management/weblogic/latest", json=collection
+        )
+        wls = wls_rest_python.WLS(
+            "https://wls.example.com:7001", "weblogic", "Welcome1", metrics=True
+        )
+    assert isinstance(wls.metrics, wls_rest_python.WLSMetrics)
+    assert wls.hooks["after_request"] == [wls.metrics.after_request]
+    assert wls.metrics.decode_count == 1
+    assert isinstance(
+        wls.session.get_adapter("https://wls.example.com"), wls_rest_python.WLSAdapter
+    )
+    assert wls.templates is None
+    assert wls.detector is None
+
+
+def test_wls_init_link_templates():
+    collection = {
+        "version": "12.2.1.3",
+        "isLatest": True,
+        "lifecycle": "active",
+        "links": [{"rel": "edit", "href": "https://edit-link"}],
+    }
+    templates = wls_rest_python.WLSTemplates()
+    with requests_mock.mock() as r:
+        r.get(
+            "https://wls.example.com:7001/management/weblogic/latest", json=collection
+        )
+        wls = wls_rest_python.WLS(
+            "https://wls.example.com:7001",
+            "weblogic",
+            "Welcome1",
+            link_templates=templates,
+        )
+    assert wls.templates is templates
+    assert wls.edit._templates is templates
+
+
+def test_wls_init_thread_safe():
+    collection = {
+        "version": "12.2.1.3",
+        "isLatest": True,
+        "lifecycle": "active",
+        "links": [],
+    }
+    with requests_mock.mock() as r:
+        r.get(
+            "https://wls.example.com:7001/management/weblogic/latest", json=collection
+        )
+        wls = wls_rest_python.WLS(
+            "https://wls.example.com:7001",
+            "weblogic",
+            "Welcome1",
+            verify=False,
+            thread_safe=True,
+        )
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other = executor.submit(lambda: wls.session).result()
+    assert other is not wls.session
+    assert wls.session is wls.session
+    for session in (wls.session, other):
+        assert session.auth == ("weblogic", "Welcome1")
+        assert session.verify is False
+        assert session.headers["X-Requested-By"].startswith("wls-rest-python")
+    assert other.get_adapter("https://wls.example.com") is wls.session.get_adapter(
+        "https://wls.example.com"
+    )
+    assert len(wls._sessions) == 2
+    wls.close()
+
+
+def test_wls_adapter_hooks(monkeypatch):
+    response = MagicMock()
+    monkeypatch.setattr(
+        wls_rest_python.HTTPAdapter, "send", MagicMock(return_value=response)
+    )
+    calls = []
+    hooks = {
+        "before_request": [lambda request: calls.append(("before", request))],
+        "after_request": [
+            lambda request, response, elapsed: calls.append(
+                ("after", request, response, elapsed >= 0)
+            )
+        ],
+    }
+    adapter = wls_rest_python.WLSAdapter(hooks)
+    request = MagicMock()
+    assert adapter.send(request, timeout=5) is response
+    assert calls == [("before", request), ("after", request, response, True)]
+
+
+def test_wls_adapter_hooks_failed_request(monkeypatch):
+    monkeypatch.setattr(
+        wls_rest_python.HTTPAdapter,
+        "send",
+        MagicMock(side_effect=requests.ConnectionError),
+    )
+    calls = []
+    hooks = {
+        "before_request": [],
+        "after_request": [lambda *args: calls.append(args[1])],
+    }
+    adapter = wls_rest_python.WLSAdapter(hooks)
+    with pytest.raises(requests.ConnectionError):
+        adapter.send(MagicMock())
+    assert calls == [None]
+
+
+def test_wls_metrics():
+    metrics = wls_rest_python.WLSMetrics()
+    for url, status, elapsed in [
+        ("https://h/management/weblogic/latest/edit/servers/s1", 200, 0.02),
+        ("https://h/management/weblogic/latest/edit/servers/s2", 200, 0.3),
+        ("https://h/management/weblogic/latest/edit/servers/s3", 404, 0.001),
+    ]:
+        request = MagicMock(method="GET", url=url, body=None)
+        metrics.after_request(request, MagicMock(status_code=status), elapsed)
+    request = MagicMock(method="POST", url="https://h/x", body=b"12345")
+    metrics.after_request(request, None, 1)
+    metrics.record_decode(100, 0.5)
+
+    summary = metrics.summary()
+    assert len(summary) == 3
+    ok = [x for x in summary if x["status"] == 200][0]
+    assert ok["method"] == "GET"
+    assert ok["template"] == "/management/weblogic/{version}/edit/servers/{name}"
+    assert ok["count"] == 2
+    assert ok["max_time"] == 0.3
+    assert sum(ok["buckets"]) == 2
+    assert ok["buckets"][1] == 1
+    assert metrics.bytes_out == 5
+    assert metrics.bytes_in == 100
+    assert metrics.decode_time == 0.5
+
+    metrics.reset()
+    assert metrics.summary() == []
+
+
+def test_wls_detector_repeats(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(wls_rest_python, "_now", lambda: now[0])
+    detector = wls_rest_python.WLSDetector(window=5, max_repeats=2)
+    request = MagicMock(method="GET", url="https://h/management/weblogic/latest/edit")
+    detector.before_request(request)
+    detector.before_request(request)
+    detector.before_request(MagicMock(method="POST", url=request.url))
+    with pytest.warns(wls_rest_python.RedundantRequestWarning) as warned:
+        detector.before_request(request)
+    assert str(warned[0].message).startswith(
+        "https://h/management/weblogic/latest/edit fetched 3 times (from "
+        "test_wls_detector_repeats in "
+    )
+    assert warned[0].filename == __file__.replace(".pyc", ".py")
+    # the requests are forgotten after the window
+    now[0] = 10
+    detector.before_request(request)
+    detector.before_request(request)
+    assert list(detector.findings.values()) == [1]
+
+
+def test_wls_detector_items():
+    detector = wls_rest_python.WLSDetector(max_items=2, raise_errors=True)
+    url = "https://h/management/weblogic/latest/edit/servers/{}"
+    with pytest.raises(
+        wls_rest_python.RedundantRequestException,
+        match="edit/servers/{name} fetched 3 times, once per item",
+    ):
+        for name in ("s1", "s2", "s3"):
+            detector.before_request(MagicMock(method="GET", url=url.format(name)))
+    assert name == "s3"
+    detector.reset()
+    assert not detector.findings
+
+
+def test_wls_limiter_rate(monkeypatch):
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(wls_rest_python, "_now", lambda: now[0])
+    monkeypatch.setattr(wls_rest_python.time, "sleep", sleep)
+    limiter = wls_rest_python.WLSLimiter(rate=10, burst=2)
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release()
+    assert sleeps == [pytest.approx(0.1), pytest.approx(0.1)]
+    assert limiter.waits == 2
+    assert limiter.wait_time == pytest.approx(0.2)
+    assert limiter.max_wait == pytest.approx(0.1)
+    # the bucket is refilled while idle, up to the burst
+    now[0] += 10
+    for _ in range(2):
+        limiter.acquire()
+    assert len(sleeps) == 2
+    assert limiter.in_flight == 2
+
+
+def test_wls_limiter_adapter(monkeypatch):
+    limiter = wls_rest_python.WLSLimiter(max_in_flight=1)
+    seen = []
+
+    def send(*args, **kwargs):
+        seen.append(limiter.in_flight)
+        raise requests.ConnectionError
+
+    monkeypatch.setattr(wls_rest_python.HTTPAdapter, "send", send)
+    hooks = {
+        "before_request": [lambda request: seen.append(limiter.in_flight)],
+        "after_request": [lambda *args: seen.append(limiter.in_flight)],
+    }
+    adapter = wls_rest_python.WLSAdapter(hooks, limiter=limiter)
+    with pytest.raises(requests.ConnectionError):
+        adapter.send(MagicMock())
+    # the slot is released even if the request failed
+    assert seen == [0, 1, 0]
+    assert limiter._slots.acquire(False)
+    assert limiter.waits == 0
+
+
+@pytest.mark.parametrize(
+    "url, template",
+    [
+        (
+            "https://h/management/weblogic/latest/edit/servers/myServer/SSL",
+            "/management/weblogic/{version}/edit/servers/{name}/SSL",
+        ),
+        (
+            "https://h/management/weblogic/latest/domainRuntime/serverLifeCycleRuntimes/myServers/tasks/_3_start",
+            "/management/weblogic/{version}/domainRuntime/serverLifeCycleRuntimes/{name}/tasks/{name}",
+        ),
+        (
+            "https://h/management/weblogic/latest/domainRuntime/deploymentManager?links=none",
+            "/management/weblogic/{version}/domainRuntime/deploymentManager",
+        ),
+    ],
+)
+def test_wls_url_template(url, template):
+    assert wls_rest_python._url_template(url) == template
+
+
 def test_wls_get():
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
     fake_wls.timeout = 372
+    fake_wls.cache = None
     fake_wls.session = MagicMock()
     fake_wls.session.get = MagicMock()
     wls_rest_python.WLS.get(fake_wls, "https://url", weird_requests_option="hei")
@@ -142,6 +438,7 @@ def test_wls_get():
 def test_wls_post():
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
     fake_wls.timeout = 372
+    fake_wls.cache = None
     fake_wls.session = MagicMock()
     fake_wls.session.post = MagicMock()
     wls_rest_python.WLS.post(fake_wls, "https://url", weird_requests_option="hei")
@@ -150,9 +447,66 @@ def test_wls_post():
     )
 
 
+def test_wls_post_with_headers():
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.timeout = 372
+    fake_wls.cache = None
+    fake_wls.session = MagicMock()
+    wls_rest_python.WLS.post(
+        fake_wls, "https://url", True, headers={"Content-Type": "text/plain"}
+    )
+    fake_wls.session.post.assert_called_once_with(
+        "https://url",
+        headers={"Content-Type": "text/plain", "Prefer": "respond-async"},
+        timeout=372,
+    )
+
+
+def test_wls_post_json():
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.timeout = 372
+    fake_wls.cache = None
+    fake_wls.codec = wls_rest_python.WLSCodec("json")
+    fake_wls.session = MagicMock()
+    wls_rest_python.WLS.post(fake_wls, "https://url", True, json={"ssl": True})
+    fake_wls.session.post.assert_called_once_with(
+        "https://url",
+        headers={"Prefer": "respond-async", "Content-Type": "application/json"},
+        data=b'{"ssl": true}',
+        timeout=372,
+    )
+
+
+@pytest.mark.parametrize("name", ["json", "ujson", "orjson"])
+def test_wls_codec(name):
+    if name != "json":
+        pytest.importorskip(name)
+    codec = wls_rest_python.WLSCodec(name)
+    assert codec.name == name
+    assert codec.loads(b'{"name": "\xc3\xa6", "items": [1, 2.5]}') == {
+        "name": b"\xc3\xa6".decode("utf-8"),
+        "items": [1, 2.5],
+    }
+    assert codec.loads(codec.dumps({"a": [True, None]})) == {"a": [True, None]}
+    assert isinstance(codec.dumps({}), bytes)
+    with pytest.raises(ValueError):
+        codec.loads(b"<html>")
+
+
+def test_wls_codec_default(monkeypatch):
+    monkeypatch.setattr(wls_rest_python, "orjson", None)
+    monkeypatch.setattr(wls_rest_python, "ujson", None)
+    assert wls_rest_python.WLSCodec().name == "json"
+    with pytest.raises(ImportError):
+        wls_rest_python.WLSCodec("ujson")
+    with pytest.raises(ValueError):
+        wls_rest_python.WLSCodec("simplejson")
+
+
 def test_wls_delete():
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
     fake_wls.timeout = 372
+    fake_wls.cache = None
     fake_wls.session = MagicMock()
     fake_wls.session.delete = MagicMock()
     wls_rest_python.WLS.delete(fake_wls, "https://url", weird_requests_option="hei")
@@ -161,6 +515,327 @@ def test_wls_delete():
     )
 
 
+def test_wls_get_cached():
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.timeout = 372
+    fake_wls.cache = wls_rest_python.WLSCache(ttl=60)
+    fake_wls.flights = None
+    fake_wls.session = MagicMock()
+    fake_wls._handle_response = MagicMock(return_value={"name": "hei"})
+    assert wls_rest_python.WLS.get(fake_wls, "https://url") == {"name": "hei"}
+    assert wls_rest_python.WLS.get(fake_wls, "https://url") == {"name": "hei"}
+    fake_wls.session.get.assert_called_once_with("https://url", timeout=372)
+    assert fake_wls.cache.hits == 1
+    assert fake_wls.cache.misses == 1
+
+    # different params are cached separately
+    wls_rest_python.WLS.get(fake_wls, "https://url", params={"fields": "name"})
+    assert fake_wls.session.get.call_count == 2
+
+    # other requests options are not cached
+    wls_rest_python.WLS.get(fake_wls, "https://url", headers={"a": "b"})
+    wls_rest_python.WLS.get(fake_wls, "https://url", headers={"a": "b"})
+    assert fake_wls.session.get.call_count == 4
+
+
+def test_wls_get_coalesced():
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.timeout = 372
+    fake_wls.cache = None
+    fake_wls.flights = wls_rest_python.WLSFlights()
+    release = threading.Event()
+
+    def get(url, **kwargs):
+        release.wait(5)
+        return MagicMock()
+
+    fake_wls.session = MagicMock()
+    fake_wls.session.get = MagicMock(side_effect=get)
+    fake_wls._handle_response = MagicMock(return_value={"name": "hei"})
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(wls_rest_python.WLS.get, fake_wls, "https://url")
+            for _ in range(4)
+        ]
+        while fake_wls.flights.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+    results = [future.result() for future in futures]
+    assert results == [{"name": "hei"}] * 4
+    assert all(result is results[0] for result in results)
+    fake_wls.session.get.assert_called_once_with("https://url", timeout=372)
+    # a later request is sent as usual
+    wls_rest_python.WLS.get(fake_wls, "https://url")
+    assert fake_wls.session.get.call_count == 2
+
+
+def test_wls_flights_error():
+    flights = wls_rest_python.WLSFlights()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise wls_rest_python.ServiceUnavailableException("Not running")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, "key", fail)
+        started.wait(5)
+        waiter = executor.submit(flights.do, "key", fail)
+        while flights.coalesced < 1:
+            time.sleep(0.001)
+        release.set()
+    for future in (leader, waiter):
+        with pytest.raises(wls_rest_python.ServiceUnavailableException):
+            future.result()
+    assert flights.do("key", lambda: 42) == 42
+
+
+def test_wls_post_invalidates_cache():
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.timeout = 372
+    fake_wls.cache = wls_rest_python.WLSCache(ttl=60)
+    fake_wls.session = MagicMock()
+    for url in [
+        "https://url",
+        "https://url/item",
+        "https://url/item/sub",
+        "https://other",
+    ]:
+        fake_wls.cache.store(fake_wls.cache.make_key(url, {}), {})
+    wls_rest_python.WLS.post(fake_wls, "https://url/item")
+    assert len(fake_wls.cache) == 1
+    wls_rest_python.WLS.delete(fake_wls, "https://other")
+    assert len(fake_wls.cache) == 0
+
+
+def test_wls_cache_lru(monkeypatch):
+    cache = wls_rest_python.WLSCache(max_size=2, ttl=10)
+    monkeypatch.setattr(wls_rest_python, "_now", lambda: 100)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    assert cache.lookup("a") == (True, 1)
+    cache.store("c", 3)
+    assert cache.evictions == 1
+    assert cache.lookup("b") == (False, None)
+    assert cache.lookup("a") == (True, 1)
+    assert cache.lookup("c") == (True, 3)
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+
+def test_wls_cache_ttl(monkeypatch):
+    cache = wls_rest_python.WLSCache(ttl=10)
+    monkeypatch.setattr(wls_rest_python, "_now", lambda: 100)
+    cache.store("a", 1)
+    monkeypatch.setattr(wls_rest_python, "_now", lambda: 109)
+    assert cache.lookup("a") == (True, 1)
+    monkeypatch.setattr(wls_rest_python, "_now", lambda: 110)
+    assert cache.lookup("a") == (False, None)
+    assert len(cache) == 0
+
+
+def test_wls_cache_key():
+    make_key = wls_rest_python.WLSCache.make_key
+    assert make_key("https://url/", {}) == make_key("https://url", {})
+    assert make_key(
+        "https://url", {"params": {"fields": ["a", "b"], "links": "none"}}
+    ) == make_key(
+        "https://url", {"params": [("links", "none"), ("fields", ["a", "b"])]}
+    )
+    assert make_key("https://url", {"stream": True}) is None
+
+
+def test_wls_templates():
+    templates = wls_rest_python.WLSTemplates()
+    base = "https://wls/management/weblogic/latest/domainRuntime/serverRuntimes"
+    templates.store(base + "/ms1", "start", "action", base + "/ms1/start")
+    # not relative to the object
+    templates.store(base + "/ms1", "server", "link", "https://wls/edit/servers/ms1")
+    assert len(templates) == 1
+    assert templates.lookup(base + "/ms2", "start") == ("action", base + "/ms2/start")
+    assert templates.lookup(base + "/ms2", "server") is None
+    assert templates.lookup(base, "start") is None
+    assert (templates.hits, templates.misses) == (1, 2)
+
+
+def test_wls_object_compact():
+    collection = {
+        "links": [
+            {"rel": "action", "title": "start", "href": "https://url/start"},
+            {"rel": "JVMRuntime", "href": "https://url/JVMRuntime"},
+            {"rel": "server", "href": "https://other-url/server"},
+        ]
+    }
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value=collection)
+    wls_obj = wls_rest_python.WLSObject("name", "https://url", fake_wls)
+    # the urls are stored relative to the parent, if possible
+    assert wls_obj.JVMRuntime._url == "https://url/JVMRuntime"
+    assert wls_obj.JVMRuntime._segment == "/JVMRuntime"
+    assert wls_obj.start._url == "https://url/start"
+    assert wls_obj.start._segment == "/start"
+    assert wls_obj.server._url == "https://other-url/server"
+    assert wls_obj.server._base is None
+    assert not hasattr(wls_obj, "__dict__")
+    with pytest.raises(AttributeError):
+        wls_obj.JVMRuntime._something = True
+
+
+def test_wls_object_templates():
+    base = "https://wls/management/weblogic/latest/domainRuntime/serverRuntimes"
+    collection = {
+        "name": "ms1",
+        "links": [
+            {"rel": "action", "title": "start", "href": base + "/ms1/start"},
+            {"rel": "JVMRuntime", "href": base + "/ms1/JVMRuntime"},
+        ],
+    }
+    templates = wls_rest_python.WLSTemplates()
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value=collection)
+    ms1 = wls_rest_python.WLSObject("ms1", base + "/ms1", fake_wls, templates=templates)
+    ms2 = wls_rest_python.WLSObject("ms2", base + "/ms2", fake_wls, templates=templates)
+    assert ms1.start._url == base + "/ms1/start"
+    assert ms1.JVMRuntime._url == base + "/ms1/JVMRuntime"
+    assert fake_wls.get.call_count == 2
+    # resolved without fetching ms2
+    assert isinstance(ms2.start, wls_rest_python.WLSAction)
+    assert ms2.start._url == base + "/ms2/start"
+    assert ms2.JVMRuntime._url == base + "/ms2/JVMRuntime"
+    assert ms2.JVMRuntime._templates is templates
+    assert fake_wls.get.call_count == 2
+
+
+def test_wls_wait_for_jobs(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(wls_rest_python.time, "sleep", sleeps.append)
+    polls = {
+        "https://job1": iter(
+            [{"completed": False}, {"completed": True, "progress": "success"}]
+        ),
+        "https://job2": iter([{"completed": True, "progress": "failed"}]),
+        "https://job3": iter(
+            [{"completed": False}, {"completed": False}, {"completed": True}]
+        ),
+    }
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls._fetch = MagicMock(side_effect=lambda url: next(polls[url]))
+    jobs = [
+        wls_rest_python.WLSObject(
+            "job{}".format(i), "https://job{}".format(i), fake_wls
+        )
+        for i in (1, 2, 3)
+    ]
+    completed = list(
+        wls_rest_python.WLS.wait_for_jobs(fake_wls, jobs, poll=2, max_poll=2.5)
+    )
+    assert [job._name for job in completed] == ["job2", "job1", "job3"]
+    assert completed[0].progress == "failed"
+    assert completed[1].progress == "success"
+    assert sleeps == [2, 2.5]
+    assert fake_wls._fetch.call_count == 6
+
+
+def test_wls_wait_for_jobs_timeout(monkeypatch):
+    now = [100]
+    monkeypatch.setattr(wls_rest_python, "_now", lambda: now[0])
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(wls_rest_python.time, "sleep", sleep)
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls._fetch = MagicMock(return_value={"completed": False})
+    job = wls_rest_python.WLSObject("job", "https://job", fake_wls)
+    with pytest.raises(wls_rest_python.JobTimeoutException) as error:
+        list(wls_rest_python.WLS.wait_for_jobs(fake_wls, [job], timeout=10, poll=4))
+    assert error.value.jobs == [job]
+    # polled at 100, 104 and 110
+    assert now[0] == 110
+    assert fake_wls._fetch.call_count == 3
+
+
+def test_wls_wait_for_jobs_errors(monkeypatch):
+    monkeypatch.setattr(wls_rest_python.time, "sleep", lambda seconds: None)
+    gone = wls_rest_python.NotFoundException("gone")
+    polls = {
+        "https://job1": iter(
+            [wls_rest_python.ServiceUnavailableException(), {"completed": True}]
+        ),
+        "https://job2": iter([gone]),
+        "https://job3": iter([{"completed": False}, {"completed": True}]),
+    }
+
+    def fetch(url):
+        result = next(polls[url])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls._fetch = MagicMock(side_effect=fetch)
+    jobs = [
+        wls_rest_python.WLSObject(
+            "job{}".format(i), "https://job{}".format(i), fake_wls
+        )
+        for i in (1, 2, 3)
+    ]
+    waiting = wls_rest_python.WLS.wait_for_jobs(fake_wls, jobs)
+    # the unavailable job is polled again, and the other jobs are waited for
+    assert [job._name for job in itertools.islice(waiting, 2)] == ["job1", "job3"]
+    with pytest.raises(wls_rest_python.JobPollException) as error:
+        next(waiting)
+    assert error.value.jobs == [jobs[1]]
+    assert error.value.errors == [gone]
+
+
+STREAMED_COLLECTION = {
+    "items": [
+        {
+            "name": "queue{}".format(i),
+            "messagesCurrentCount": i,
+            "averageSize": 1.5,
+            "links": [{"rel": "self", "href": "https://url/queue{}".format(i)}],
+        }
+        for i in range(3)
+    ],
+    "links": [{"rel": "self", "href": "https://url"}],
+}
+
+
+@pytest.mark.parametrize("with_ijson", [True, False])
+def test_wls_stream_items(monkeypatch, with_ijson):
+    if with_ijson:
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(wls_rest_python, "ijson", None)
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
+    fake_wls.timeout = 372
+    fake_wls.session = requests.Session()
+    with requests_mock.mock() as r:
+        r.get("https://url", json=STREAMED_COLLECTION)
+        items = wls_rest_python.WLS.stream_items(fake_wls, "https://url")
+        assert next(items) == STREAMED_COLLECTION["items"][0]
+        assert list(items) == STREAMED_COLLECTION["items"][1:]
+
+
+def test_wls_stream_items_error():
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.timeout = 372
+    fake_wls.session = MagicMock()
+    fake_wls.session.get.return_value.ok = False
+    fake_wls._handle_error.side_effect = wls_rest_python.NotFoundException
+    with pytest.raises(wls_rest_python.NotFoundException):
+        list(wls_rest_python.WLS.stream_items(fake_wls, "https://url"))
+    fake_wls.session.get.assert_called_once_with(
+        "https://url", timeout=372, stream=True
+    )
+    fake_wls.session.get.return_value.close.assert_called_once_with()
+
+
 def test_wls_handle_response_from_get():
     # it is important that we get the raw json back from GET
     # as otherwise it wil get messy (recursion)
@@ -169,6 +844,7 @@ def test_wls_handle_response_from_get():
         "links": [{"rel": "self", "href": "https://self-link"}],
     }
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
     response = MagicMock()
     response.ok = True
     # 'get'.upper() to check == and not is
@@ -182,6 +858,7 @@ def test_wls_handle_response_from_get():
 
 def test_wls_handle_response_empty():
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
     response = MagicMock()
     response.ok = True
     response.json = MagicMock(return_value={})
@@ -198,6 +875,7 @@ def test_wls_handle_response_job():
         "completed": False,
     }
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
     response = MagicMock()
     response.ok = True
     response.json = MagicMock(return_value=job)
@@ -227,6 +905,7 @@ def test_wls_handle_response_object():
         ],
     }
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
     response = MagicMock()
     response.ok = True
     response.json = MagicMock(return_value=collection)
@@ -247,6 +926,7 @@ def test_wls_handle_response_no_self_link():
         ],
     }
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
     response = MagicMock()
     response.ok = True
     response.json = MagicMock(return_value=what)
@@ -258,6 +938,7 @@ def test_wls_handle_response_no_self_link():
 def test_wls_handle_response_unknown():
     what = {"what": True, "is": False, "this": "true story"}
     fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
     response = MagicMock()
     response.ok = True
     response.json = MagicMock(return_value=what)
@@ -277,6 +958,72 @@ def test_wls_handle_response_with_error():
     fake_wls._handle_error.assert_called_once_with(response)
 
 
+def test_wls_handle_response_no_debug_logging(caplog):
+    caplog.set_level(logging.INFO, logger="wls_rest_python")
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
+    response = MagicMock()
+    response.ok = True
+    response.request.method = "GET"
+    response.json = MagicMock(return_value={})
+    wls_rest_python.WLS._handle_response(fake_wls, response)
+    fake_wls._log_exchange.assert_not_called()
+
+
+def test_wls_handle_response_debug_logging(caplog):
+    caplog.set_level(logging.DEBUG, logger="wls_rest_python")
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
+    response = MagicMock()
+    response.ok = True
+    response.request.method = "GET"
+    response.json = MagicMock(return_value={})
+    wls_rest_python.WLS._handle_response(fake_wls, response)
+    fake_wls._log_exchange.assert_called_once_with(response)
+
+
+def make_logged_response():
+    response = MagicMock()
+    response.request.method = "POST"
+    response.request.url = "https://url"
+    response.request.headers = {"Authorization": "Basic secret", "Accept": "*/*"}
+    response.request.body = b'{"a": "b"}'
+    response.status_code = 200
+    response.headers = {"Set-Cookie": "JSESSIONID=secret", "Content-Length": "20"}
+    response.content = b"0123456789" * 2
+    response.elapsed.total_seconds.return_value = 0.25
+    return response
+
+
+def test_wls_log_exchange(caplog):
+    caplog.set_level(logging.DEBUG, logger="wls_rest_python")
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.log_body_limit = 8
+    fake_wls.log_trace = False
+    wls_rest_python.WLS._log_exchange(fake_wls, make_logged_response())
+    assert "secret" not in caplog.text
+    assert "Authorization: <redacted>" in caplog.text
+    assert "Content-Length: 20" in caplog.text
+    assert '{"a": "b... (2 bytes truncated)' in caplog.text
+    assert "01234567... (12 bytes truncated)" in caplog.text
+
+
+def test_wls_log_exchange_trace(caplog):
+    caplog.set_level(logging.DEBUG, logger="wls_rest_python")
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.log_body_limit = None
+    fake_wls.log_trace = True
+    wls_rest_python.WLS._log_exchange(fake_wls, make_logged_response())
+    trace = caplog.records[0].wls_trace
+    assert trace["method"] == "POST"
+    assert trace["status"] == 200
+    assert trace["elapsed"] == 0.25
+    assert trace["request_headers"]["Authorization"] == "<redacted>"
+    assert trace["response_headers"]["Set-Cookie"] == "<redacted>"
+    assert trace["response_body"] == "01234567890123456789"
+    assert "secret" not in caplog.text
+
+
 def test_wls_handle_error_400():
     response = MagicMock()
     response.status_code = 400
@@ -305,6 +1052,7 @@ def test_wls_handle_error_400_with_alternative_json():
     )
     with pytest.raises(wls_rest_python.BadRequestException, match="Type mismatch"):
         wls_rest_python.WLS._handle_error(response)
+    response.json.assert_called_once_with()
 
 
 def test_wls_handle_error_401():
@@ -473,6 +1221,199 @@ def test_wls_object_getitem():
         wls_obj["what"]
 
 
+def test_wls_object_lazy_getattr():
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value={"nativeIOEnabled": True, "links": []})
+    wls_obj = wls_rest_python.WLSObject("edit", "https://edit", fake_wls, lazy=True)
+    server = wls_obj.servers.myServer
+    fake_wls.get.assert_not_called()
+    assert server._url == "https://edit/servers/myServer"
+    assert server._lazy is True
+    assert server["nativeIOEnabled"] is True
+    fake_wls.get.assert_called_once_with("https://edit/servers/myServer")
+    with pytest.raises(AttributeError):
+        wls_obj._private
+
+
+def test_wls_object_lazy_quotes_name():
+    fake_wls = MagicMock()
+    wls_obj = wls_rest_python.WLSObject("apps", "https://apps", fake_wls, lazy=True)
+    assert getattr(wls_obj, "myWebapp#1.2.3")._url == "https://apps/myWebapp%231.2.3"
+
+
+def test_wls_object_lazy_fallback_to_link():
+    collections = {
+        "https://edit": {
+            "links": [{"rel": "servers", "href": "https://edit/weird-servers"}]
+        },
+        "https://edit/weird-servers": {"items": []},
+    }
+
+    def get(url, **kwargs):
+        try:
+            return collections[url]
+        except KeyError:
+            raise wls_rest_python.NotFoundException()
+
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(side_effect=get)
+    wls_obj = wls_rest_python.WLSObject("edit", "https://edit", fake_wls, lazy=True)
+    servers = wls_obj.servers
+    assert len(servers) == 0
+    assert servers._url == "https://edit/weird-servers"
+    assert servers._parent is None
+
+
+def test_wls_object_lazy_not_found():
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(
+        side_effect=[wls_rest_python.NotFoundException(), {"nativeIOEnabled": True}]
+    )
+    wls_obj = wls_rest_python.WLSObject("server", "https://server", fake_wls, lazy=True)
+    with pytest.raises(wls_rest_python.NotFoundException):
+        dir(wls_obj.nativeIOEnabled)
+
+
+def test_wls_object_projected_property():
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value={"state": "RUNNING"})
+    wls_obj = wls_rest_python.WLSObject("name", "https://url", fake_wls, projected=True)
+    assert wls_obj.state == "RUNNING"
+    fake_wls.get.assert_called_once_with("https://url", params={"fields": "state,name"})
+
+
+def test_wls_object_projected_link():
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(
+        return_value={
+            "name": "server",
+            "links": [{"rel": "SSL", "href": "https://url/SSL"}],
+        }
+    )
+    wls_obj = wls_rest_python.WLSObject("name", "https://url", fake_wls, projected=True)
+    ssl = wls_obj.SSL
+    assert ssl._url == "https://url/SSL"
+    assert ssl._projected is True
+    # one request resolves links as well as properties
+    fake_wls.get.assert_called_once_with("https://url", params={"fields": "SSL,name"})
+
+
+def test_wls_object_fetch():
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value={"state": "RUNNING"})
+    wls_obj = wls_rest_python.WLSObject("name", "https://url", fake_wls)
+    assert wls_obj.fetch(fields=["state", "name"], links=[]) == {"state": "RUNNING"}
+    fake_wls.get.assert_called_once_with(
+        "https://url", params={"fields": "state,name", "links": "none"}
+    )
+    wls_obj.fetch(exclude_fields="healthState", exclude_links=["action"])
+    fake_wls.get.assert_called_with(
+        "https://url",
+        params={"excludeFields": "healthState", "excludeLinks": "action"},
+    )
+    wls_obj.fetch()
+    fake_wls.get.assert_called_with("https://url")
+
+
+def test_wls_object_search():
+    query = {
+        "links": [],
+        "children": {
+            "serverRuntimes": {
+                "fields": ["name", "state", "healthState"],
+                "links": [],
+                "children": {"JVMRuntime": {"fields": ["heapFreeCurrent"]}},
+            }
+        },
+    }
+    result = {
+        "name": "mydomain",
+        "serverRuntimes": {
+            "items": [
+                {
+                    "name": "AdminServer",
+                    "state": "RUNNING",
+                    "healthState": {"state": "ok"},
+                    "JVMRuntime": {"heapFreeCurrent": 12345},
+                },
+                {
+                    "name": "myServer",
+                    "state": "SHUTDOWN",
+                    "healthState": {"state": "ok"},
+                    "JVMRuntime": {"heapFreeCurrent": 54321},
+                },
+            ]
+        },
+    }
+    fake_wls = MagicMock()
+    fake_wls._search = MagicMock(return_value=result)
+    domain_runtime = wls_rest_python.WLSObject(
+        "domainRuntime", "https://url/domainRuntime", fake_wls
+    )
+    tree = domain_runtime.search(query)
+    fake_wls._search.assert_called_once_with("https://url/domainRuntime/search", query)
+    assert tree.name == "mydomain"
+    assert len(tree.serverRuntimes) == 2
+    assert [s.state for s in tree.serverRuntimes] == ["RUNNING", "SHUTDOWN"]
+    server = tree.serverRuntimes.myServer
+    assert server._url == "https://url/domainRuntime/serverRuntimes/myServer"
+    assert server.healthState == {"state": "ok"}
+    assert server.JVMRuntime.heapFreeCurrent == 54321
+    assert "JVMRuntime" in dir(server)
+    with pytest.raises(AttributeError):
+        server.openSocketsCurrentCount
+    fake_wls.get.assert_not_called()
+
+
+def test_wls_search():
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = wls_rest_python.WLSCodec("json")
+    fake_wls.timeout = 372
+    fake_wls.session = MagicMock()
+    fake_wls._handle_response = MagicMock(return_value={"name": "mydomain"})
+    decoded = wls_rest_python.WLS._search(fake_wls, "https://url/search", {"links": []})
+    fake_wls.session.post.assert_called_once_with(
+        "https://url/search",
+        data=b'{"links": []}',
+        headers={"Content-Type": "application/json"},
+        timeout=372,
+    )
+    fake_wls._handle_response.assert_called_once_with(
+        fake_wls.session.post.return_value, raw=True
+    )
+    assert decoded == {"name": "mydomain"}
+
+
+def test_wls_handle_response_raw():
+    collection = {"name": "naaame", "links": [{"rel": "self", "href": "https://link"}]}
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.codec = None
+    response = MagicMock()
+    response.ok = True
+    response.request.method = "POST"
+    response.json = MagicMock(return_value=collection)
+    assert (
+        wls_rest_python.WLS._handle_response(fake_wls, response, raw=True) == collection
+    )
+
+
+def test_wls_object_stream_items():
+    fake_wls = MagicMock()
+    fake_wls.stream_items = MagicMock(return_value=iter(STREAMED_COLLECTION["items"]))
+    wls_obj = wls_rest_python.WLSObject("name", "https://url", fake_wls)
+    items = list(wls_obj.stream_items(fields=["messagesCurrentCount"]))
+    assert [item._url for item in items] == [
+        "https://url/queue0",
+        "https://url/queue1",
+        "https://url/queue2",
+    ]
+    fake_wls.stream_items.assert_called_once_with(
+        "https://url", params={"fields": "messagesCurrentCount,name"}
+    )
+    list(wls_obj.stream_items())
+    fake_wls.stream_items.assert_called_with("https://url", params=None)
+
+
 def test_wls_object_iter():
     collection = {
         "items": [
@@ -563,6 +1504,9 @@ def test_wls_object_with_len():
     fake_wls.get = MagicMock(return_value=collection)
     wls_obj = wls_rest_python.WLSObject("name", "https://url", fake_wls)
     assert len(wls_obj) == 4
+    fake_wls.get.assert_called_once_with(
+        "https://url", params={"fields": "name", "links": "none"}
+    )
 
 
 def test_wls_object_with_zero_len():
@@ -652,6 +1596,223 @@ def test_wls_object_update():
     fake_wls.post.assert_called_with("https://url", True, json={"ssl": True})
 
 
+def test_wls_object_seeded_items():
+    parent = {
+        "items": [
+            {
+                "links": [{"rel": "self", "href": "https://self-link"}],
+                "state": "RUNNING",
+                "name": "item 1",
+            }
+        ]
+    }
+    child = {
+        "links": [{"rel": "action", "title": "start", "href": "https://start-link"}],
+        "state": "SHUTDOWN",
+        "name": "item 1",
+        "heapFreeCurrent": 42,
+    }
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value=parent)
+    wls_obj = wls_rest_python.WLSObject("name", "https://url", fake_wls)
+    item = next(iter(wls_obj))
+    fake_wls.get = MagicMock(return_value=child)
+    # the properties from the parent are reused
+    assert item.state == "RUNNING"
+    fake_wls.get.assert_not_called()
+    # the others are fetched
+    assert item.heapFreeCurrent == 42
+    item.start()
+    fake_wls.get.assert_called_with("https://self-link")
+    # the action might change the state
+    assert item.state == "SHUTDOWN"
+
+
+def test_wls_object_refresh():
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value={"state": "SHUTDOWN"})
+    wls_obj = wls_rest_python.WLSObject(
+        "name", "https://url", fake_wls, seed={"state": "RUNNING"}
+    )
+    assert wls_obj.state == "RUNNING"
+    assert wls_obj.refresh() is wls_obj
+    assert wls_obj.state == "SHUTDOWN"
+    fake_wls.get.assert_called_once_with("https://url")
+
+
+def test_wls_object_update_drops_seed():
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(return_value={"ssl": True})
+    wls_obj = wls_rest_python.WLSObject(
+        "name", "https://url", fake_wls, seed={"ssl": False}
+    )
+    wls_obj.update(ssl=True)
+    assert wls_obj.ssl is True
+
+
+def test_wls_upload(tmpdir):
+    source = tmpdir.join("my app.ear")
+    source.write_binary(b"x" * 2500)
+    progress = []
+    upload = wls_rest_python.WLSUpload(
+        {"model": {"name": "myApp"}},
+        {"sourcePath": str(source)},
+        chunk_size=1000,
+        progress=lambda sent, total: progress.append((sent, total)),
+    )
+    assert upload.content_type == "multipart/form-data; boundary={}".format(
+        upload.boundary
+    )
+    chunks = list(iter(lambda: upload.read(1024), b""))
+    body = b"".join(chunks)
+    assert len(body) == len(upload)
+    assert max(len(chunk) for chunk in chunks) == 1024
+    boundary = upload.boundary.encode("ascii")
+    assert body == (
+        b"--" + boundary + b"\r\n"
+        b'Content-Disposition: form-data; name="model"\r\n'
+        b"Content-Type: application/json\r\n\r\n"
+        b'{"name": "myApp"}\r\n'
+        b"--" + boundary + b"\r\n"
+        b'Content-Disposition: form-data; name="sourcePath"; filename="my app.ear"\r\n'
+        b"Content-Type: application/octet-stream\r\n\r\n"
+        + b"x" * 2500
+        + b"\r\n--"
+        + boundary
+        + b"--\r\n"
+    )
+    assert progress[-1] == (len(body), len(body))
+    assert upload.read() == b""
+
+
+def test_wls_object_deploy(tmpdir):
+    source = tmpdir.join("app.ear")
+    source.write_binary(b"app")
+    plan = tmpdir.join("plan.xml")
+    plan.write_binary(b"plan")
+    fake_wls = MagicMock()
+    wls_obj = wls_rest_python.WLSObject("appDeployments", "https://url", fake_wls)
+    wls_obj.deploy({"name": "app"}, str(source), str(plan), prefer_async=True)
+    args, kwargs = fake_wls.post.call_args
+    assert args == ("https://url", True)
+    upload = kwargs["data"]
+    assert isinstance(upload, wls_rest_python.WLSUpload)
+    assert kwargs["headers"] == {"Content-Type": upload.content_type}
+    body = upload.read()
+    assert b'name="sourcePath"; filename="app.ear"' in body
+    assert b'name="planPath"; filename="plan.xml"' in body
+
+
+def test_wls_snapshot():
+    collections = {
+        "https://url": {
+            "name": "serverRuntime",
+            "state": "RUNNING",
+            "links": [
+                {"rel": "self", "href": "https://url"},
+                {"rel": "parent", "href": "https://"},
+                {"rel": "action", "title": "shutdown", "href": "https://url/shutdown"},
+                {"rel": "JVMRuntime", "href": "https://url/JVMRuntime"},
+                {"rel": "applicationRuntimes", "href": "https://url/apps"},
+            ],
+        },
+        "https://url/JVMRuntime": {"heapFreeCurrent": 42, "links": []},
+        "https://url/apps": {
+            "items": [
+                {
+                    "name": "app1",
+                    "healthState": "ok",
+                    "links": [{"rel": "self", "href": "https://url/apps/app1"}],
+                }
+            ]
+        },
+    }
+    fake_wls = MagicMock(spec=wls_rest_python.WLS)
+    fake_wls.get = MagicMock(side_effect=lambda url: collections[url])
+    root = wls_rest_python.WLSObject("serverRuntime", "https://url", fake_wls)
+    snapshot = wls_rest_python.WLS.snapshot(fake_wls, root, depth=1)
+    assert fake_wls.get.call_count == 3
+    assert snapshot.state == "RUNNING"
+    assert snapshot.JVMRuntime.heapFreeCurrent == 42
+    assert sorted(dir(snapshot)) == [
+        "JVMRuntime",
+        "applicationRuntimes",
+        "name",
+        "state",
+    ]
+    apps = snapshot.applicationRuntimes
+    assert len(apps) == 1
+    assert [app.healthState for app in apps] == ["ok"]
+    assert apps["app1"]._url == "https://url/apps/app1"
+    assert fake_wls.get.call_count == 3
+    with pytest.raises(AttributeError):
+        snapshot.shutdown
+    with pytest.raises(AttributeError):
+        snapshot.state = "SHUTDOWN"
+    with pytest.raises(TypeError):
+        len(snapshot)
+    with pytest.raises(KeyError):
+        apps["app2"]
+
+
+def make_servers(*states):
+    return {
+        "items": [
+            {"name": name, "state": state, "health": "ok"} for name, state in states
+        ]
+    }
+
+
+def test_wls_object_watch(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(wls_rest_python.time, "sleep", sleeps.append)
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(
+        side_effect=[
+            make_servers(("ms1", "RUNNING"), ("ms2", "RUNNING")),
+            make_servers(("ms1", "RUNNING"), ("ms2", "RUNNING")),
+            make_servers(("ms1", "ADMIN"), ("ms3", "STARTING")),
+        ]
+    )
+    wls_obj = wls_rest_python.WLSObject("serverRuntimes", "https://url", fake_wls)
+    changes = list(wls_obj.watch(interval=2, fields=["state"], max_polls=3))
+    assert changes == [
+        wls_rest_python.WLSChange("changed", "ms1", "state", "RUNNING", "ADMIN"),
+        wls_rest_python.WLSChange(
+            "added",
+            "ms3",
+            None,
+            None,
+            {"name": "ms3", "state": "STARTING", "health": "ok"},
+        ),
+        wls_rest_python.WLSChange(
+            "removed",
+            "ms2",
+            None,
+            {"name": "ms2", "state": "RUNNING", "health": "ok"},
+            None,
+        ),
+    ]
+    fake_wls.get.assert_called_with(
+        "https://url", params={"fields": "state,name", "links": "none"}
+    )
+    assert sleeps == [2, 2]
+
+
+def test_wls_object_watch_properties(monkeypatch):
+    monkeypatch.setattr(wls_rest_python.time, "sleep", lambda seconds: None)
+    fake_wls = MagicMock()
+    fake_wls.get = MagicMock(
+        side_effect=[{"state": "RUNNING", "port": 7001}, {"state": "ADMIN"}]
+    )
+    wls_obj = wls_rest_python.WLSObject("myServer", "https://url", fake_wls)
+    assert list(wls_obj.watch(max_polls=2)) == [
+        wls_rest_python.WLSChange("changed", "myServer", "state", "RUNNING", "ADMIN"),
+        wls_rest_python.WLSChange("changed", "myServer", "port", 7001, None),
+    ]
+    fake_wls.get.assert_called_with("https://url", params={"links": "none"})
+
+
 def test_wls_item():
     items = ["item1", "item2"]
     wls_item = wls_rest_python.WLSItems(items)
@@ -666,6 +1827,57 @@ def test_wls_item():
         wls_item.__next__()
 
 
+def test_wls_items_lazy():
+    created = []
+
+    def factory(item):
+        created.append(item)
+        return item.upper()
+
+    wls_item = wls_rest_python.WLSItems(["a", "b", "c", "d"], factory)
+    assert len(wls_item) == 4
+    assert created == []
+    assert next(wls_item) == "A"
+    assert list(itertools.islice(wls_item, 1)) == ["B"]
+    assert created == ["a", "b"]
+    assert wls_item[-1] == "D"
+    sliced = wls_item[1:3]
+    assert isinstance(sliced, wls_rest_python.WLSItems)
+    assert created == ["a", "b", "d"]
+    assert list(sliced) == ["B", "C"]
+    assert wls_item.items == ["A", "B", "C", "D"]
+
+
+def test_wls_items_iter():
+    wls_item = wls_rest_python.WLSItems(["item1", "item2"])
+    assert list(wls_item) == ["item1", "item2"]
+
+
+def test_wls_items_map():
+    def fn(item):
+        if item == 2:
+            raise wls_rest_python.BadRequestException("two")
+        return item * 10
+
+    wls_item = wls_rest_python.WLSItems([1, 2, 3])
+    results = wls_item.map(fn, max_workers=2)
+    assert results[0] == 10
+    assert isinstance(results[1], wls_rest_python.BadRequestException)
+    assert results[2] == 30
+
+
+def test_wls_items_invoke():
+    items = [MagicMock(), MagicMock()]
+    items[1].__getitem__.return_value.side_effect = wls_rest_python.WLSException
+    wls_item = wls_rest_python.WLSItems(items)
+    results = wls_item.invoke("start", prefer_async=True, concurrency=5, a="b")
+    for item in items:
+        item.__getitem__.assert_called_once_with("start")
+        item.__getitem__.return_value.assert_called_once_with(prefer_async=True, a="b")
+    assert results[0] == items[0].__getitem__.return_value.return_value
+    assert isinstance(results[1], wls_rest_python.WLSException)
+
+
 def test_wls_action_with_data():
     fake_wls = MagicMock()
     wls_action = wls_rest_python.WLSAction("name", "https://url", fake_wls)
@@ -694,3 +1906,130 @@ def test_wls_action_repr():
     fake_wls = MagicMock()
     wls_action = wls_rest_python.WLSAction("name", "https://url", fake_wls)
     assert repr(wls_action) == "<WLSAction name='name' url='https://url'>"
+
+
+def make_root(version):
+    return {
+        "version": version,
+        "isLatest": True,
+        "lifecycle": "active",
+        "links": [{"rel": "domainRuntime", "href": "https://domainruntime-link"}],
+    }
+
+
+def test_wls_fleet():
+    with requests_mock.mock() as r:
+        r.get(
+            "https://wls1:7001/management/weblogic/latest", json=make_root("12.2.1.3")
+        )
+        r.get(
+            "https://wls2:7001/management/weblogic/latest", json=make_root("12.2.1.4")
+        )
+        r.get("https://wls3:7001/management/weblogic/latest", status_code=401)
+        r.get(
+            "https://wls1:7001/management/weblogic/latest/domainRuntime/serverRuntimes",
+            json={"items": [{"name": "AdminServer", "state": "RUNNING"}]},
+        )
+        r.get(
+            "https://wls2:7001/management/weblogic/latest/domainRuntime/serverRuntimes",
+            status_code=503,
+            json={"detail": "Not running"},
+        )
+        fleet = wls_rest_python.WLSFleet(
+            {
+                "domain1": {"host": "https://wls1:7001"},
+                "domain2": {"host": "https://wls2:7001", "password": "other"},
+                "domain3": {"host": "https://wls3:7001"},
+            },
+            username="weblogic",
+            password="Welcome1",
+            max_workers=3,
+        )
+        assert list(fleet.servers) == ["domain1", "domain2"]
+        assert fleet.servers["domain2"].session.auth == ("weblogic", "other")
+        assert isinstance(
+            fleet.errors["domain3"], wls_rest_python.UnauthorizedException
+        )
+
+        versions = fleet.map(lambda wls: wls.version)
+        assert list(versions) == ["domain1", "domain2", "domain3"]
+        assert versions["domain1"] == "12.2.1.3"
+        assert versions["domain2"] == "12.2.1.4"
+        assert isinstance(versions["domain3"], wls_rest_python.UnauthorizedException)
+
+        health = fleet.health()
+        assert health["domain1"] == [{"name": "AdminServer", "state": "RUNNING"}]
+        assert isinstance(
+            health["domain2"], wls_rest_python.ServiceUnavailableException
+        )
+        assert r.last_request.qs == {
+            "fields": ["name,state,healthstate"],
+            "links": ["none"],
+        }
+        fleet.close()
+
+
+def test_wls_fleet_hosts():
+    with requests_mock.mock() as r:
+        r.get(
+            "https://wls1:7001/management/weblogic/latest", json=make_root("12.2.1.3")
+        )
+        with wls_rest_python.WLSFleet(
+            ["https://wls1:7001"], username="weblogic", password="Welcome1"
+        ) as fleet:
+            assert list(fleet.servers) == ["https://wls1:7001"]
+            assert repr(fleet) == "<WLSFleet servers=1 errors=0>"
+
+
+def test_wls_fleet_deploy(tmpdir):
+    source = tmpdir.join("app.ear")
+    source.write_binary(b"app")
+
+    def root(host):
+        return {
+            "version": "12.2.1.3",
+            "isLatest": True,
+            "lifecycle": "active",
+            "links": [{"rel": "edit", "href": "https://{}/edit".format(host)}],
+        }
+
+    def created(request, context):
+        request.body.read()
+        return {}
+
+    progress = []
+    with requests_mock.mock() as r:
+        for host in ("wls1:7001", "wls2:7001"):
+            r.get("https://{}/management/weblogic/latest".format(host), json=root(host))
+            r.get(
+                "https://{}/edit".format(host),
+                json={
+                    "links": [
+                        {
+                            "rel": "appDeployments",
+                            "href": "https://{}/edit/appDeployments".format(host),
+                        }
+                    ]
+                },
+            )
+        r.post("https://wls1:7001/edit/appDeployments", status_code=201, json=created)
+        r.post(
+            "https://wls2:7001/edit/appDeployments",
+            status_code=400,
+            json={"detail": "Already deployed"},
+        )
+        fleet = wls_rest_python.WLSFleet(
+            ["https://wls1:7001", "https://wls2:7001"],
+            username="weblogic",
+            password="Welcome1",
+        )
+        with fleet:
+            results = fleet.deploy(
+                {"name": "app"},
+                str(source),
+                progress=lambda *args: progress.append(args),
+            )
+    assert results["https://wls1:7001"] is None
+    assert isinstance(results["https://wls2:7001"], wls_rest_python.BadRequestException)
+    assert progress[-1][0] == "https://wls1:7001"
+    assert progress[-1][1] == progress[-1][2]
@@ -0,0 +1,261 @@
+import asyncio
+import json
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+import wls_rest_python
+import wls_rest_python_async
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class FakeResponse(object):
+    def __init__(self, status, body):
+        self.status = status
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def read(self):
+        return self._body
+
+
+class FakeSession(object):
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        status, body = self.responses[(method, url)]
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        return FakeResponse(status, body)
+
+    async def close(self):
+        pass
+
+
+ROOT = {
+    "version": "12.2.1.3",
+    "isLatest": True,
+    "lifecycle": "active",
+    "links": [{"rel": "domainRuntime", "href": "https://domainruntime-link"}],
+}
+
+COLLECTION = {
+    "items": [
+        {
+            "links": [{"rel": "self", "href": "https://item-link"}],
+            "state": "RUNNING",
+            "name": "item_1",
+        }
+    ],
+    "name": "navn",
+    "property": "yesyes",
+    "links": [
+        {"rel": "action", "title": "superAction", "href": "https://action-link"},
+        {"rel": "underCollection", "href": "https://undercollection-link"},
+    ],
+}
+
+
+def make_wls(responses):
+    wls = wls_rest_python_async.AsyncWLS(
+        "https://wls.example.com:7001", "weblogic", "Welcome1"
+    )
+    wls.session = FakeSession(responses)
+    return wls
+
+
+def test_async_wls_connect():
+    wls = make_wls(
+        {
+            ("GET", "https://wls.example.com:7001/management/weblogic/latest"): (
+                200,
+                ROOT,
+            )
+        }
+    )
+    run(wls.connect())
+    assert wls.version == "12.2.1.3"
+    assert wls.isLatest is True
+    assert wls.domainRuntime._url == "https://domainruntime-link"
+    assert (
+        repr(wls)
+        == "<AsyncWLS url='https://wls.example.com:7001/management/weblogic/latest' username='weblogic' version='12.2.1.3'>"
+    )
+
+
+def test_async_wls_object_aget():
+    wls = make_wls({("GET", "https://url"): (200, COLLECTION)})
+    obj = wls_rest_python_async.AsyncWLSObject("navn", "https://url", wls)
+
+    async def check():
+        assert await obj.aget("property") == "yesyes"
+        action = await obj.aget("superAction")
+        assert isinstance(action, wls_rest_python_async.AsyncWLSAction)
+        assert action._url == "https://action-link"
+        link = await obj.aget("underCollection")
+        assert link._url == "https://undercollection-link"
+        item = await obj.aget("item_1")
+        assert item._url == "https://item-link"
+        with pytest.raises(AttributeError):
+            await obj.aget("what")
+        assert "superAction" in await obj.adir()
+
+    run(check())
+    # links and actions are reused
+    run(obj.aget("superAction"))
+    assert len(wls.session.requests) == 6
+
+
+def test_async_wls_object_iter():
+    wls = make_wls({("GET", "https://url"): (200, COLLECTION)})
+    obj = wls_rest_python_async.AsyncWLSObject("navn", "https://url", wls)
+
+    async def check():
+        names = []
+        async for item in obj:
+            names.append(item._name)
+        assert names == ["item_1"]
+        assert await obj.alen() == 1
+
+    run(check())
+
+
+def test_async_wls_object_non_iter():
+    wls = make_wls({("GET", "https://url"): (200, {"name": "navn"})})
+    obj = wls_rest_python_async.AsyncWLSObject("navn", "https://url", wls)
+
+    async def check():
+        with pytest.raises(TypeError):
+            async for item in obj:
+                pass
+        with pytest.raises(TypeError):
+            await obj.alen()
+
+    run(check())
+
+
+def test_async_wls_action():
+    job = {
+        "links": [{"rel": "job", "href": "https://joblink"}],
+        "name": "Very important job",
+        "completed": False,
+    }
+    wls = make_wls({("POST", "https://action-link"): (202, job)})
+    action = wls_rest_python_async.AsyncWLSAction("start", "https://action-link", wls)
+    result = run(action(prefer_async=True))
+    assert isinstance(result, wls_rest_python_async.AsyncWLSObject)
+    assert result._url == "https://joblink"
+    assert wls.session.requests == [
+        (
+            "POST",
+            "https://action-link",
+            {"headers": {"Prefer": "respond-async"}, "json": {}},
+        )
+    ]
+
+
+def test_async_wls_object_create_headers():
+    wls = make_wls({("POST", "https://url"): (201, b"")})
+    obj = wls_rest_python_async.AsyncWLSObject("navn", "https://url", wls)
+    assert run(obj.create(prefer_async=True, headers={"X-Test": "1"}, json={})) is None
+    assert wls.session.requests[0] == (
+        "POST",
+        "https://url",
+        {"headers": {"X-Test": "1", "Prefer": "respond-async"}, "json": {}},
+    )
+
+
+def test_async_wls_object_update_and_delete():
+    wls = make_wls(
+        {("POST", "https://url"): (200, b""), ("DELETE", "https://url"): (200, {})}
+    )
+    obj = wls_rest_python_async.AsyncWLSObject("navn", "https://url", wls)
+    assert run(obj.update(nativeIOEnabled=False)) is None
+    assert run(obj.delete()) is None
+    assert wls.session.requests[0] == (
+        "POST",
+        "https://url",
+        {"headers": None, "json": {"nativeIOEnabled": False}},
+    )
+
+
+@pytest.mark.parametrize(
+    "status, exception",
+    [
+        (400, wls_rest_python.BadRequestException),
+        (404, wls_rest_python.NotFoundException),
+        (503, wls_rest_python.ServiceUnavailableException),
+    ],
+)
+def test_async_wls_errors(status, exception):
+    wls = make_wls({("GET", "https://url"): (status, {"detail": "insert detail"})})
+    with pytest.raises(exception, match="insert detail"):
+        run(wls.get("https://url"))
+
+
+def test_async_wls_error_html():
+    wls = make_wls({("GET", "https://url"): (500, b"<html>text here</html>")})
+    with pytest.raises(wls_rest_python.ServerErrorException, match="text here"):
+        run(wls.get("https://url"))
+
+
+def test_async_wls_unauthorized():
+    wls = make_wls({("GET", "https://url"): (401, b"")})
+    with pytest.raises(wls_rest_python.UnauthorizedException):
+        run(wls.get("https://url"))
+
+
+class SequenceSession(FakeSession):
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return FakeResponse(200, json.dumps(self.responses.pop(0)).encode())
+
+
+def test_async_wls_object_watch(monkeypatch):
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(wls_rest_python_async.asyncio, "sleep", sleep)
+    wls = make_wls({})
+    wls.session = SequenceSession(
+        [
+            {"items": [{"name": "ms1", "state": "RUNNING"}]},
+            {"items": [{"name": "ms1", "state": "RUNNING"}]},
+            {"items": [{"name": "ms1", "state": "ADMIN"}]},
+        ]
+    )
+    obj = wls_rest_python_async.AsyncWLSObject("serverRuntimes", "https://url", wls)
+
+    async def check():
+        changes = []
+        async for change in obj.watch(interval=3, fields="state", max_polls=3):
+            changes.append(change)
+        return changes
+
+    assert run(check()) == [
+        wls_rest_python.WLSChange("changed", "ms1", "state", "RUNNING", "ADMIN")
+    ]
+    assert sleeps == [3, 3]
+    assert wls.session.requests[0] == (
+        "GET",
+        "https://url",
+        {"headers": None, "params": {"fields": "state,name", "links": "none"}},
+    )
@@ -3,8 +3,51 @@ A Python client for the Weblogic Server REST API.
 
 https://github.com/magnuswatn/wls-rest-python
 """
+import json
 import logging
+import os
+import sys
+import threading
+import time
+import uuid
+import warnings
+import weakref
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import ijson
+except ImportError:
+    # the collections are decoded in full instead
+    ijson = None
+
+# faster JSON codecs, used instead of the json module if installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    from sys import intern
+except ImportError:
+    # python 2, where it is a builtin
+    pass
+
+try:
+    from urllib.parse import quote, urlsplit
+except ImportError:
+    # python 2
+    from urllib import quote
+    from urlparse import urlsplit
 
 __version__ = "0.1.5"
 
@@ -14,6 +57,36 @@ logger = logging.getLogger(__name__)
 # do operations that take "approximately 5 minutes" synchronous.
 DEFAULT_TIMEOUT = 305
 
+DEFAULT_CACHE_SIZE = 128
+
+# Number of bytes of the bodies to include in the debug log
+DEFAULT_LOG_BODY_LIMIT = 4096
+
+# Headers that are not included in the debug log
+REDACTED_HEADERS = ("authorization", "cookie", "set-cookie")
+
+# Same as the default of requests
+DEFAULT_POOL_SIZE = 10
+
+# Same as the connection pool size, so that
+# the threads don't have to wait for connections.
+DEFAULT_MAX_WORKERS = DEFAULT_POOL_SIZE
+
+# Retried for GET requests, e.g. while the admin server restarts
+RETRY_STATUSES = (503,)
+
+# Number of bytes read from disk at a time when uploading
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# unicode is a separate type on python 2
+try:
+    _string_types = (str, unicode)
+except NameError:
+    _string_types = (str,)
+
+# time.monotonic is not available on python 2
+_now = getattr(time, "monotonic", time.time)
+
 
 class WLSException(Exception):
     """Superclass for exceptions thrown by this module"""
@@ -84,6 +157,707 @@ class ServiceUnavailableException(WLSException):
     """
 
 
+class JobTimeoutException(WLSException):
+    """
+    Raised when waiting for jobs, if they are not completed before the timeout.
+    The jobs that are still pending are available in the jobs attribute.
+    """
+
+    def __init__(self, message, jobs=None):
+        super(JobTimeoutException, self).__init__(message)
+        self.jobs = jobs or []
+
+
+class JobPollException(WLSException):
+    """
+    Raised when waiting for jobs, after the other jobs are completed, if some
+    of them could not be polled. The jobs are available in the jobs attribute,
+    and the exception from each of them in the errors attribute.
+    """
+
+    def __init__(self, message, jobs=None, errors=None):
+        super(JobPollException, self).__init__(message)
+        self.jobs = jobs or []
+        self.errors = errors or []
+
+
+# errors when polling that are expected to go away, e.g. during a restart
+_TRANSIENT_ERRORS = (
+    ServiceUnavailableException,
+    requests.ConnectionError,
+    requests.Timeout,
+)
+
+
+class RedundantRequestException(WLSException):
+    """
+    Raised by WLSDetector, if configured to raise,
+    when a request is found to be redundant.
+    """
+
+
+class RedundantRequestWarning(UserWarning):
+    """
+    Warned by WLSDetector when a request is found to be redundant.
+    """
+
+
+class WLSCache(object):
+    """
+    A size-bounded LRU cache, with time-to-live, for decoded GET responses.
+
+    Entries are keyed by URL and query parameters. The cached collections
+    are shared between callers, so they must not be modified.
+
+    :param int max_size: Maximum number of entries to keep.
+    :param float ttl: Number of seconds an entry is valid.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<WLSCache size={} hits={} misses={} evictions={}>".format(
+            len(self), self.hits, self.misses, self.evictions
+        )
+
+    @staticmethod
+    def make_key(url, kwargs):
+        """
+        Creates the cache key for a GET request.
+
+        Returns None if the request can not be cached,
+        i.e. if it uses other requests options than params.
+        """
+        if set(kwargs) - {"params"}:
+            return None
+        params = kwargs.get("params")
+        if isinstance(params, dict):
+            params = params.items()
+        if isinstance(params, (list, tuple, type({}.items()))):
+            params = tuple(
+                sorted(
+                    (k, tuple(v) if isinstance(v, (list, tuple)) else v)
+                    for k, v in params
+                )
+            )
+        return (url.rstrip("/"), params)
+
+    def lookup(self, key):
+        """
+        Looks up an entry.
+
+        Returns a tuple of (found, collection).
+        """
+        with self._lock:
+            try:
+                expires, collection = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return False, None
+            if expires <= _now():
+                self.misses += 1
+                return False, None
+            # re-insert to mark as most recently used
+            self._entries[key] = (expires, collection)
+            self.hits += 1
+            return True, collection
+
+    def store(self, key, collection):
+        """Stores an entry, evicting the least recently used if full"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (_now() + self.ttl, collection)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, url):
+        """
+        Removes the entries for the URL, and for its ancestors and descendants.
+
+        The ancestors are removed as well, since a collection
+        includes the properties of its items.
+        """
+        url = url.split("?")[0].rstrip("/")
+        with self._lock:
+            for key in list(self._entries):
+                cached_url = key[0]
+                if (
+                    cached_url == url
+                    or url.startswith(cached_url + "/")
+                    or cached_url.startswith(url + "/")
+                ):
+                    del self._entries[key]
+
+    def clear(self):
+        """Removes all the entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+class _Flight(object):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class WLSFlights(object):
+    """
+    Coalesces concurrent identical GET requests, so that only one of
+    them is sent, and the others wait for it and get the same result,
+    or the same exception.
+
+    Since the callers share the decoded collection, it must not be modified.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<WLSFlights in_flight={} coalesced={}>".format(
+            len(self._flights), self.coalesced
+        )
+
+    def do(self, key, fn):
+        """Calls fn, unless a call with the same key is in flight"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+
+class WLSTemplates(object):
+    """
+    Remembers the links and actions of each type of object, so that
+    they can be resolved on sibling objects without fetching them.
+
+    The type is the URL template of the object, e.g.
+    /management/weblogic/{version}/domainRuntime/serverRuntimes/{name},
+    and only links relative to the URL of the object are remembered.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __repr__(self):
+        return "<WLSTemplates size={} hits={} misses={}>".format(
+            len(self), self.hits, self.misses
+        )
+
+    def lookup(self, url, attr):
+        """
+        Looks up a link or action of an object.
+
+        Returns a tuple of (kind, url), or None if not known.
+        """
+        url = url.rstrip("/")
+        with self._lock:
+            found = self._templates.get((_url_template(url), attr))
+            if found is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        kind, suffix = found
+        return kind, url + suffix
+
+    def store(self, url, attr, kind, href):
+        """Stores a link or action, if it is relative to the object"""
+        url = url.rstrip("/")
+        if not href.startswith(url + "/"):
+            return
+        with self._lock:
+            self._templates[(_url_template(url), attr)] = (kind, href[len(url) :])
+
+    def clear(self):
+        """Removes all the templates"""
+        with self._lock:
+            self._templates.clear()
+
+
+# Upper bounds, in seconds, of the buckets in the latency histograms
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf"))
+
+
+def _url_template(url):
+    """
+    Creates a template of an URL, for grouping requests.
+
+    The item names are replaced with {name}. Since they can't be
+    told apart from the links by the URL alone, a segment is assumed
+    to be an item if the segment before it is plural, e.g. "servers".
+    """
+    segments = urlsplit(url).path.split("/")
+    template = []
+    collapsed = False
+    for previous, segment in zip([""] + segments, segments):
+        if previous == "weblogic":
+            segment = "{version}"
+        elif previous.endswith("s") and not collapsed:
+            segment = "{name}"
+        collapsed = segment == "{name}"
+        template.append(segment)
+    return "/".join(template)
+
+
+def _body_size(request):
+    body = request.body
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, _string_types)):
+        return len(body)
+    return int(request.headers.get("Content-Length", 0))
+
+
+class WLSMetrics(object):
+    """
+    Collects metrics about the requests sent to the server.
+
+    The requests are grouped by method, status and URL template
+    (with the item names replaced). The status is None if no
+    response was received.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.decode_count = 0
+        self.decode_time = 0.0
+
+    def __repr__(self):
+        return "<WLSMetrics requests={} bytes_out={} bytes_in={}>".format(
+            sum(stats["count"] for stats in self.requests.values()),
+            self.bytes_out,
+            self.bytes_in,
+        )
+
+    def after_request(self, request, response, elapsed):
+        """Records a request. Can be used as an after_request hook."""
+        key = (
+            request.method,
+            None if response is None else response.status_code,
+            _url_template(request.url),
+        )
+        size = _body_size(request)
+        with self._lock:
+            stats = self.requests.get(key)
+            if stats is None:
+                stats = self.requests[key] = {
+                    "count": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                    "buckets": [0] * len(LATENCY_BUCKETS),
+                }
+            stats["count"] += 1
+            stats["total_time"] += elapsed
+            stats["max_time"] = max(stats["max_time"], elapsed)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    stats["buckets"][i] += 1
+                    break
+            self.bytes_out += size
+
+    def record_decode(self, size, elapsed):
+        """Records the decoding of a response body"""
+        with self._lock:
+            self.bytes_in += size
+            self.decode_count += 1
+            self.decode_time += elapsed
+
+    def summary(self):
+        """
+        Returns a list with a dict per group of requests, with the
+        method, status, template, count, total_time, max_time and buckets.
+        """
+        with self._lock:
+            return [
+                dict(stats, method=method, status=status, template=template)
+                for (method, status, template), stats in sorted(
+                    self.requests.items(), key=lambda x: str(x[0])
+                )
+            ]
+
+    def reset(self):
+        """Clears all the metrics"""
+        with self._lock:
+            self.requests = {}
+            self.bytes_out = 0
+            self.bytes_in = 0
+            self.decode_count = 0
+            self.decode_time = 0.0
+
+
+# Modules whose frames are skipped when looking for the call site of a request
+_INTERNAL_MODULES = (
+    "wls_rest_python",
+    "requests",
+    "urllib3",
+    "concurrent",
+    "threading",
+)
+
+
+def _call_site():
+    """Returns the filename, line number and function of the calling code"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.split(".")[0] not in _INTERNAL_MODULES:
+            code = frame.f_code
+            return code.co_filename, frame.f_lineno, code.co_name
+        frame = frame.f_back
+    return None
+
+
+class WLSDetector(object):
+    """
+    Detects redundant GET requests, e.g. N+1 patterns where a loop
+    fetches each item of a collection separately.
+
+    Tracks the GET requests within a time window, and reports when the
+    same URL is fetched more than max_repeats times, or when one line of
+    code fetches more than max_items objects of the same type. Each finding
+    is reported once, with the line of code that sent the requests.
+    Can be used as a before_request hook.
+
+    :param float window: Number of seconds to track the requests for.
+    :param int max_repeats: Number of times the same URL can be fetched.
+    :param int max_items: Number of objects of the same type one line
+        of code can fetch.
+    :param bool raise_errors: Raise RedundantRequestException instead of
+        warning with RedundantRequestWarning.
+    """
+
+    def __init__(self, window=10.0, max_repeats=2, max_items=10, raise_errors=False):
+        self.window = window
+        self.max_repeats = max_repeats
+        self.max_items = max_items
+        self.raise_errors = raise_errors
+        # the findings, mapped to the number of times they were seen
+        self.findings = OrderedDict()
+        self._requests = deque()
+        self._urls = Counter()
+        self._sites = Counter()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<WLSDetector findings={}>".format(len(self.findings))
+
+    def before_request(self, request):
+        """Checks a request. Can be used as a before_request hook."""
+        if request.method != "GET":
+            return
+        site = _call_site()
+        template = _url_template(request.url)
+        group = (template, site) if "{name}" in template else None
+        now = _now()
+        with self._lock:
+            while self._requests and self._requests[0][0] <= now - self.window:
+                self._forget(*self._requests.popleft()[1:])
+            self._requests.append((now, request.url, group))
+            self._urls[request.url] += 1
+            findings = []
+            if self._urls[request.url] > self.max_repeats:
+                findings.append(
+                    (
+                        "{} fetched {} times".format(
+                            request.url, self._urls[request.url]
+                        ),
+                        ("repeat", request.url, site),
+                    )
+                )
+            if group is not None:
+                self._sites[group] += 1
+                if self._sites[group] > self.max_items:
+                    findings.append(
+                        (
+                            "{} fetched {} times, once per item".format(
+                                template, self._sites[group]
+                            ),
+                            ("items", template, site),
+                        )
+                    )
+            new = []
+            for message, key in findings:
+                if key not in self.findings:
+                    new.append(message)
+                self.findings[key] = self.findings.get(key, 0) + 1
+
+        for message in new:
+            self._report(message, site)
+
+    def _forget(self, url, group):
+        self._urls[url] -= 1
+        if not self._urls[url]:
+            del self._urls[url]
+        if group is not None:
+            self._sites[group] -= 1
+            if not self._sites[group]:
+                del self._sites[group]
+
+    def _report(self, message, site):
+        if site is not None:
+            message = "{} (from {} in {}:{})".format(message, site[2], *site[:2])
+        if self.raise_errors:
+            raise RedundantRequestException(message)
+        if site is None:
+            warnings.warn(message, RedundantRequestWarning)
+        else:
+            warnings.warn_explicit(message, RedundantRequestWarning, *site[:2])
+
+    def reset(self):
+        """Clears the tracked requests and the findings"""
+        with self._lock:
+            self.findings = OrderedDict()
+            self._requests.clear()
+            self._urls.clear()
+            self._sites.clear()
+
+
+class WLSLimiter(object):
+    """
+    Limits the requests sent to a server, to protect its small pool
+    of threads. Requests over the limits wait in the client.
+
+    Can be shared between servers, e.g. in a WLSFleet, to limit them together.
+    The time spent waiting is kept in waits, wait_time and max_wait.
+
+    :param int max_in_flight: Maximum number of requests in flight at once.
+        Default is no limit.
+    :param float rate: Maximum number of requests per second, on average.
+        Default is no limit.
+    :param int burst: Number of requests that can be sent at once,
+        before the rate applies. Default is 1.
+    """
+
+    def __init__(self, max_in_flight=None, rate=None, burst=1):
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.burst = burst
+        self.in_flight = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self._slots = threading.Semaphore(max_in_flight) if max_in_flight else None
+        self._tokens = float(burst)
+        self._updated = _now()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<WLSLimiter in_flight={} waits={} wait_time={:.3f}>".format(
+            self.in_flight, self.waits, self.wait_time
+        )
+
+    def _reserve(self):
+        """Takes a token from the bucket, and returns how long to wait for it"""
+        with self._lock:
+            now = _now()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # the token is taken even if it is not there yet, so
+            # that the waiting requests are spaced out by the rate
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """Waits until a request can be sent. Returns the seconds waited."""
+        start = _now()
+        blocked = False
+        if self.rate:
+            delay = self._reserve()
+            if delay:
+                blocked = True
+                time.sleep(delay)
+        if self._slots is not None and not self._slots.acquire(False):
+            blocked = True
+            self._slots.acquire()
+        waited = _now() - start if blocked else 0.0
+        with self._lock:
+            self.in_flight += 1
+            if blocked:
+                self.waits += 1
+                self.wait_time += waited
+                self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def release(self):
+        """Marks a request as done"""
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+
+class WLSAdapter(HTTPAdapter):
+    """
+    A transport adapter that runs the before_request and after_request hooks.
+
+    The before_request hooks are called with the prepared request, and the
+    after_request hooks with the request, the response (None if it failed)
+    and the elapsed time in seconds. If there is a limiter, the requests
+    wait for it after the before_request hooks, and the waiting is not
+    included in the elapsed time.
+    """
+
+    def __init__(self, hooks, limiter=None, **kwargs):
+        self.hooks = hooks
+        self.limiter = limiter
+        super(WLSAdapter, self).__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):
+        for hook in self.hooks["before_request"]:
+            hook(request)
+        if self.limiter is not None:
+            self.limiter.acquire()
+        start = _now()
+        response = None
+        try:
+            response = super(WLSAdapter, self).send(request, *args, **kwargs)
+        finally:
+            elapsed = _now() - start
+            if self.limiter is not None:
+                self.limiter.release()
+            for hook in self.hooks["after_request"]:
+                hook(request, response, elapsed)
+        return response
+
+
+def _retry(retries, backoff):
+    """
+    Creates the retry policy for the transport adapter.
+
+    Connection errors are retried for all methods, since the request
+    was not sent, while read errors and 503 are only retried for GET.
+    If all retries fail, the last 503 response is returned, so that
+    it raises ServiceUnavailableException as usual.
+    """
+    kwargs = {
+        "total": retries,
+        "backoff_factor": backoff,
+        "status_forcelist": RETRY_STATUSES,
+        "raise_on_status": False,
+    }
+    try:
+        return Retry(allowed_methods=frozenset(["GET"]), **kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=frozenset(["GET"]), **kwargs)
+
+
+class WLSCodec(object):
+    """
+    Encodes and decodes JSON bodies, with orjson, ujson
+    or the json module of the standard library.
+
+    :param string name: The module to use, "orjson", "ujson" or "json".
+        Default is the fastest one installed.
+    """
+
+    def __init__(self, name=None):
+        modules = OrderedDict([("orjson", orjson), ("ujson", ujson), ("json", json)])
+        if name is None:
+            name = next(name for name, module in modules.items() if module)
+        if name not in modules:
+            raise ValueError("Unknown JSON codec: {}".format(name))
+        if modules[name] is None:
+            raise ImportError("{} is not installed".format(name))
+        self.name = name
+        self._module = modules[name]
+
+    def __repr__(self):
+        return "<WLSCodec name='{}'>".format(self.name)
+
+    def loads(self, data):
+        """Decodes a body"""
+        if self.name == "json" and isinstance(data, bytes):
+            # json only accepts bytes on python 3.6+
+            data = data.decode("utf-8")
+        return self._module.loads(data)
+
+    def dumps(self, obj):
+        """Encodes an object to a body"""
+        data = self._module.dumps(obj)
+        return data if isinstance(data, bytes) else data.encode("utf-8")
+
+
+def _decode_json(response, metrics, codec=None):
+    start = _now()
+    if codec is None:
+        decoded = response.json()
+    else:
+        decoded = codec.loads(response.content)
+    if metrics is not None:
+        metrics.record_decode(len(response.content), _now() - start)
+    return decoded
+
+
+def _redact(headers):
+    """Returns a copy of the headers, with the sensitive values redacted"""
+    return OrderedDict(
+        (k, "<redacted>" if k.lower() in REDACTED_HEADERS else v)
+        for k, v in headers.items()
+    )
+
+
+def _truncate(body, limit):
+    """Decodes the start of a body for logging"""
+    if body is None:
+        return None
+    if not isinstance(body, (bytes, _string_types)):
+        # e.g. a file or generator that is streamed
+        return "<{} body>".format(type(body).__name__)
+    truncated = body if limit is None else body[:limit]
+    if isinstance(truncated, bytes):
+        truncated = truncated.decode("utf-8", "replace")
+    if len(body) > len(truncated):
+        truncated += "... ({} bytes truncated)".format(len(body) - len(truncated))
+    return truncated
+
+
 class WLS(object):
     """
     Represents a WLS REST server
@@ -94,8 +868,53 @@ class WLS(object):
     :param string version: Version of the rest interface to use. Defaults to "latest"
     :param bool verify: Whether to verify certificates on SSL connections.
     :param float timeout: The timeout value to use, in seconds. Default is 305.
+    :param float connect_timeout: A separate timeout for establishing connections,
+        in seconds. Default is to use timeout.
+    :param int pool_connections: Number of hosts to keep connection pools for.
+        Default is 10.
+    :param int pool_maxsize: Maximum number of connections to keep per host.
+        Default is 10.
+    :param int retries: Number of times to retry GET requests that fails with
+        503 or connection errors. Default is 0.
+    :param float retry_backoff: Backoff factor between the retries, in seconds.
+        The sleep is retry_backoff * 2 ** (retry number - 1). Default is 0.5.
+    :param float cache_ttl: Cache the GET responses for this many seconds.
+        Default is no caching.
+    :param int cache_size: Maximum number of cached GET responses. Default is 128.
+    :param bool coalesce: Send only one of concurrent identical GET requests,
+        and share the result between the callers. Default is True.
+    :param bool lazy_paths: Build the URLs of child objects without fetching
+        their parents. Default is False.
+    :param bool projected_reads: Only request the needed field, the names and
+        the links when reading attributes of objects. Default is False.
+    :param link_templates: Resolve links and actions of objects from those
+        already seen on objects of the same type, without fetching them. Either
+        True, or an WLSTemplates instance to share it between servers.
+        Default is False.
+    :param int log_body_limit: Maximum number of bytes of the request and response
+        bodies to include in the debug log. None means no limit. Default is 4096.
+    :param bool log_trace: Log each request as a structured record, in the
+        wls_trace attribute of the log record, instead of as text. Default is False.
+    :param metrics: Collect metrics about the requests. Either True, or
+        an WLSMetrics instance to share it between servers. Default is None.
+    :param detector: Warn about redundant requests, e.g. N+1 patterns. Either
+        True, or an WLSDetector instance, e.g. to raise instead. Default is None.
+    :param bool thread_safe: Give each thread its own session, sharing the
+        connection pool, so that the server can be used from many threads.
+        Default is False.
+    :param codec: The JSON codec for the request and response bodies. Either
+        the name of it, or an WLSCodec instance. Default is the fastest one
+        installed, orjson, ujson or json.
+    :param limiter: An WLSLimiter, to limit the number of requests in flight
+        and per second. Can be shared between servers. Default is no limit.
     """
 
+    metrics = None
+    detector = None
+    limiter = None
+    _local = None
+    templates = None
+
     def __init__(
         self,
         host,
@@ -104,10 +923,54 @@ class WLS(object):
         version="latest",
         verify=True,
         timeout=DEFAULT_TIMEOUT,
+        connect_timeout=None,
+        pool_connections=DEFAULT_POOL_SIZE,
+        pool_maxsize=DEFAULT_POOL_SIZE,
+        retries=0,
+        retry_backoff=0.5,
+        cache_ttl=None,
+        cache_size=DEFAULT_CACHE_SIZE,
+        coalesce=True,
+        lazy_paths=False,
+        projected_reads=False,
+        link_templates=False,
+        log_body_limit=DEFAULT_LOG_BODY_LIMIT,
+        log_trace=False,
+        metrics=None,
+        detector=None,
+        thread_safe=False,
+        codec=None,
+        limiter=None,
     ):
+        self.log_body_limit = log_body_limit
+        if link_templates is True:
+            link_templates = WLSTemplates()
+        # an empty WLSTemplates is falsy, so compare explicitly
+        self.templates = link_templates if link_templates is not False else None
+        self.log_trace = log_trace
+        self.cache = WLSCache(cache_size, cache_ttl) if cache_ttl else None
+        self.flights = WLSFlights() if coalesce else None
+        self.codec = codec if isinstance(codec, WLSCodec) else WLSCodec(codec)
         self.session = requests.Session()
         self.session.verify = verify
         self.session.auth = (username, password)
+        self.hooks = {"before_request": [], "after_request": []}
+        if metrics:
+            self.metrics = WLSMetrics() if metrics is True else metrics
+            self.hooks["after_request"].append(self.metrics.after_request)
+        if detector:
+            self.detector = WLSDetector() if detector is True else detector
+            self.hooks["before_request"].append(self.detector.before_request)
+        self.limiter = limiter
+        adapter = WLSAdapter(
+            self.hooks,
+            limiter=limiter,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=_retry(retries, retry_backoff),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         user_agent = "wls-rest-python {} ({})".format(
             __version__, self.session.headers["User-Agent"]
         )
@@ -118,14 +981,24 @@ class WLS(object):
                 "X-Requested-By": user_agent,
             }
         )
-        self.timeout = timeout
+        if thread_safe:
+            self._local = threading.local()
+            self._sessions = weakref.WeakSet()
+        self.timeout = (connect_timeout, timeout) if connect_timeout else timeout
         self.base_url = "{}/management/weblogic/{}".format(host, version)
         collection = self.get(self.base_url)
         self.version = collection["version"]
         self.isLatest = collection["isLatest"]
         self.lifecycle = collection["lifecycle"]
         for link in collection["links"]:
-            link_obj = WLSObject(link["rel"], link["href"], self)
+            link_obj = WLSObject(
+                link["rel"],
+                link["href"],
+                self,
+                lazy=lazy_paths,
+                projected=projected_reads,
+                templates=self.templates,
+            )
             setattr(self, link["rel"], link_obj)
 
     def __repr__(self):
@@ -133,15 +1006,96 @@ class WLS(object):
             self.base_url, self.session.auth[0], self.version
         )
 
+    @property
+    def session(self):
+        """
+        The requests session. If thread safe, each thread gets its own
+        copy of it, with the same transport adapter and thus connection pool.
+        """
+        if self._local is None:
+            return self._session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.verify = self._session.verify
+            session.auth = self._session.auth
+            session.headers = self._session.headers.copy()
+            for prefix, adapter in self._session.adapters.items():
+                session.mount(prefix, adapter)
+            self._local.session = session
+            self._sessions.add(session)
+        return session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def close(self):
+        """Closes the sessions, and the connections in the pool"""
+        self._session.close()
+        if self._local is not None:
+            for session in list(self._sessions):
+                session.close()
+
     def get(self, url, **kwargs):
         """
         Does a GET request to the specified URL.
 
-        Returns the decoded JSON.
+        Returns the decoded JSON. If caching is enabled,
+        it might be returned from the cache. If the same request
+        is already in flight, its result is returned instead.
         """
+        key = WLSCache.make_key(url, kwargs)
+        if self.cache is not None and key is not None:
+            found, collection = self.cache.lookup(key)
+            if found:
+                return collection
+
+        def fetch():
+            collection = self._fetch(url, **kwargs)
+            if self.cache is not None and key is not None:
+                self.cache.store(key, collection)
+            return collection
+
+        if key is not None and self.flights is not None:
+            return self.flights.do(key, fetch)
+        return fetch()
+
+    def _fetch(self, url, **kwargs):
+        """Does a GET request, bypassing the cache and the requests in flight"""
         response = self.session.get(url, timeout=self.timeout, **kwargs)
         return self._handle_response(response)
 
+    def stream_items(self, url, **kwargs):
+        """
+        Does a streaming GET request to the specified URL, and yields
+        the decoded items of the collection as they are received.
+
+        The items are decoded incrementally if ijson is installed,
+        otherwise the whole response is decoded first.
+        """
+        response = self.session.get(url, timeout=self.timeout, stream=True, **kwargs)
+        try:
+            logger.debug(
+                "Sent streaming GET request to %s, got HTTP %s",
+                url,
+                response.status_code,
+            )
+            if not response.ok:
+                self._handle_error(response)
+
+            if ijson is None:
+                for item in _decode_json(response, None, self.codec).get("items", []):
+                    yield item
+                return
+
+            # Let urllib3 handle any Content-Encoding
+            response.raw.decode_content = True
+            for item in ijson.items(response.raw, "items.item", use_float=True):
+                yield item
+        finally:
+            response.close()
+
     def post(self, url, prefer_async=False, **kwargs):
         """
         Does a POST request to the specified URL.
@@ -149,10 +1103,15 @@ class WLS(object):
         If the response is a job or an collection, it will return an
         WLSObject. Otherwise it will return the decoded JSON
         """
-        headers = {"Prefer": "respond-async"} if prefer_async else None
+        headers = _prefer(prefer_async, kwargs.pop("headers", None))
+        if "json" in kwargs:
+            kwargs["data"] = self.codec.dumps(kwargs.pop("json"))
+            headers = dict(headers or {}, **{"Content-Type": "application/json"})
         response = self.session.post(
             url, headers=headers, timeout=self.timeout, **kwargs
         )
+        if self.cache is not None:
+            self.cache.invalidate(url)
         return self._handle_response(response)
 
     def delete(self, url, prefer_async=False, **kwargs):
@@ -162,56 +1121,209 @@ class WLS(object):
         If the response is a job or an collection, it will return an
         WLSObject. Otherwise it will return the decoded JSON
         """
-        headers = {"Prefer": "respond-async"} if prefer_async else None
+        headers = _prefer(prefer_async, kwargs.pop("headers", None))
         response = self.session.delete(
             url, headers=headers, timeout=self.timeout, **kwargs
         )
+        if self.cache is not None:
+            self.cache.invalidate(url)
         return self._handle_response(response)
 
-    def _handle_response(self, response):
-        logger.debug(
-            "Sent %s request to %s, with headers:\n%s\n\nand body:\n%s",
-            response.request.method,
-            response.request.url,
-            "\n".join(
-                ["{0}: {1}".format(k, v) for k, v in response.request.headers.items()]
-            ),
-            response.request.body,
-        )
-        logger.debug(
-            "Recieved response:\nHTTP %s\n%s\n\n%s",
-            response.status_code,
-            "\n".join(["{0}: {1}".format(k, v) for k, v in response.headers.items()]),
-            response.content.decode(),
+    def search(self, query, tree="domainRuntime"):
+        """
+        Searches a tree with a query like
+        {"fields": [...], "links": [...], "children": {...}}
+
+        Returns the result as an WLSObject, already populated,
+        so that it can be navigated without more requests.
+        """
+        return getattr(self, tree).search(query)
+
+    def snapshot(self, root, depth=0, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Takes a snapshot of an object and the objects below it.
+
+        The object is fetched, and then its children and items, level by
+        level, down to the depth, with the objects of each level fetched
+        concurrently. Only links below the URL of an object are followed.
+
+        Returns a WLSSnapshot, which can be navigated without more requests.
+        """
+        collection = root._get_collection()
+        snapshot = WLSSnapshot(root._name, root._url, collection)
+        level = [snapshot]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in range(depth):
+                pending = [
+                    (parent, kind, name, url)
+                    for parent in level
+                    for kind, name, url in parent._children()
+                ]
+                collections = executor.map(lambda x: self.get(x[3]), pending)
+                level = []
+                for (parent, kind, name, url), collection in zip(pending, collections):
+                    child = WLSSnapshot(name, url, collection)
+                    parent._add(kind, name, child)
+                    level.append(child)
+        return snapshot
+
+    def wait_for_jobs(
+        self,
+        jobs,
+        timeout=None,
+        poll=1.0,
+        max_poll=30.0,
+        max_workers=DEFAULT_MAX_WORKERS,
+    ):
+        """
+        Waits for jobs, e.g. from actions invoked with prefer_async=True.
+
+        The pending jobs are polled concurrently, first every poll seconds,
+        then backing off to every max_poll seconds. The jobs are yielded as
+        they complete, populated with their final collection, so that their
+        status can be read without more requests.
+
+        The jobs are always fetched from the server, not the cache. If a job
+        can not be polled because the server is unavailable, it is polled
+        again later. Other errors, e.g. if the job is purged, do not stop the
+        waiting for the other jobs, but are raised as a JobPollException
+        at the end.
+
+        Raises JobTimeoutException if the jobs are not completed
+        within timeout seconds.
+        """
+
+        def fetch(job):
+            try:
+                return self._fetch(job._url)
+            except Exception as error:
+                return error
+
+        pending = list(jobs)
+        failed = []
+        errors = []
+        deadline = None if timeout is None else _now() + timeout
+        interval = poll
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending:
+                collections = list(executor.map(fetch, pending))
+                still_pending = []
+                for job, collection in zip(pending, collections):
+                    if isinstance(collection, _TRANSIENT_ERRORS):
+                        logger.debug("Could not poll %s: %s", job._url, collection)
+                        still_pending.append(job)
+                    elif isinstance(collection, Exception):
+                        logger.warning("Could not poll %s: %s", job._url, collection)
+                        failed.append(job)
+                        errors.append(collection)
+                    elif collection.get("completed"):
+                        yield job._child(job._name, job._url, collection=collection)
+                    else:
+                        still_pending.append(job)
+                pending = still_pending
+                if not pending:
+                    break
+
+                if deadline is None:
+                    time.sleep(interval)
+                else:
+                    remaining = deadline - _now()
+                    if remaining <= 0:
+                        raise JobTimeoutException(
+                            "{} jobs not completed within {} seconds".format(
+                                len(pending), timeout
+                            ),
+                            pending,
+                        )
+                    time.sleep(min(interval, remaining))
+                interval = min(interval * 1.5, max_poll)
+
+        if failed:
+            raise JobPollException(
+                "{} jobs could not be polled".format(len(failed)), failed, errors
+            )
+
+    def _search(self, url, query):
+        """
+        Does the search POST request to the specified URL.
+
+        Returns the decoded JSON.
+        """
+        response = self.session.post(
+            url,
+            data=self.codec.dumps(query),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
         )
+        return self._handle_response(response, raw=True)
+
+    def _handle_response(self, response, raw=False):
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_exchange(response)
 
         if not response.ok:
             self._handle_error(response)
 
         # GET is used by the WLSObject to retrieve the collection
         # so it must return only the decoded JSON, not an WLSobject
-        if response.request.method == "GET":
-            return response.json()
+        if raw or response.request.method == "GET":
+            return _decode_json(response, self.metrics, self.codec)
 
-        response_json = response.json()
+        response_json = _decode_json(response, self.metrics, self.codec)
         if not response_json:
             return None
 
-        try:
-            link = next(
-                (
-                    x["href"]
-                    for x in response_json["links"]
-                    if x["rel"] in ("self", "job")
-                )
-            )
-            name = response_json["name"]
-        except (KeyError, StopIteration):
+        found = _response_link(response_json)
+        if found is None:
             # Not a job, and not a collection.
             # Don't know what it is, so just return the decoded json
             return response_json
 
-        return WLSObject(name, link, self)
+        name, link = found
+        return WLSObject(name, link, self, templates=self.templates)
+
+    def _log_exchange(self, response):
+        request = response.request
+        request_body = _truncate(request.body, self.log_body_limit)
+        response_body = _truncate(response.content, self.log_body_limit)
+        if self.log_trace:
+            logger.debug(
+                "%s %s: HTTP %s",
+                request.method,
+                request.url,
+                response.status_code,
+                extra={
+                    "wls_trace": {
+                        "method": request.method,
+                        "url": request.url,
+                        "status": response.status_code,
+                        "elapsed": response.elapsed.total_seconds(),
+                        "request_headers": _redact(request.headers),
+                        "request_body": request_body,
+                        "response_headers": _redact(response.headers),
+                        "response_body": response_body,
+                    }
+                },
+            )
+            return
+
+        logger.debug(
+            "Sent %s request to %s, with headers:\n%s\n\nand body:\n%s",
+            request.method,
+            request.url,
+            "\n".join(
+                ["{0}: {1}".format(k, v) for k, v in _redact(request.headers).items()]
+            ),
+            request_body,
+        )
+        logger.debug(
+            "Recieved response:\nHTTP %s\n%s\n\n%s",
+            response.status_code,
+            "\n".join(
+                ["{0}: {1}".format(k, v) for k, v in _redact(response.headers).items()]
+            ),
+            response_body,
+        )
 
     @staticmethod
     def _handle_error(response):
@@ -244,47 +1356,429 @@ class WLS(object):
         elif response.status_code == 503:
             exception_type = ServiceUnavailableException
 
+        # decoded once, since the body might be large
         try:
-            exception_message = response.json()["detail"]
-        except KeyError:
-            exception_message = response.json()
+            decoded = response.json()
         except ValueError:
             exception_message = response.text
+        else:
+            try:
+                exception_message = decoded["detail"]
+            except KeyError:
+                exception_message = decoded
 
         raise exception_type(exception_message)
 
 
-class WLSObject(object):
+def _projection(fields=None, exclude_fields=None, links=None, exclude_links=None):
+    """
+    Creates the query parameters that limits the fields and links
+    returned by the server. The arguments can be lists or comma separated
+    strings, and an empty list of links means no links.
+    """
+
+    def join(names):
+        return names if isinstance(names, _string_types) else ",".join(names)
+
+    params = {}
+    if fields is not None:
+        params["fields"] = join(fields)
+    if exclude_fields is not None:
+        params["excludeFields"] = join(exclude_fields)
+    if links is not None:
+        params["links"] = join(links) or "none"
+    if exclude_links is not None:
+        params["excludeLinks"] = join(exclude_links)
+    return params
+
+
+def _attribute_names(collection):
+    """Lists the names of the properties, links, actions and items in a collection"""
+    attrs = []
+    for key in collection:
+        item = collection[key]
+        if key == "links":
+            for link in item:
+                if link["rel"] == "action":
+                    name = link["title"]
+                else:
+                    name = link["rel"]
+                attrs.append(name)
+        elif key == "items":
+            for itm in item:
+                attrs.append(itm["name"])
+        else:
+            attrs.append(key)
+    return attrs
+
+
+def _find_attribute(collection, attr):
+    """
+    Finds an attribute in a collection.
+
+    Returns a tuple of the kind ("action", "link", "item" or "property",
+    or None if not found) and the link, item or property value.
+    """
+    for key in collection:
+        item = collection[key]
+        if key == "links":
+            for link in item:
+                if link["rel"] == "action":
+                    if link["title"] == attr:
+                        return "action", link
+                elif link["rel"] == attr:
+                    return "link", link
+
+        elif key == "items":
+            for itm in item:
+                if itm["name"] == attr:
+                    return "item", itm
+
+        elif key == attr:
+            return "property", item
+
+    return None, None
+
+
+def _response_link(response_json):
+    """
+    Finds the name and link of a job or collection in a response.
+
+    Returns None if it is neither.
+    """
+    try:
+        link = next(
+            (x["href"] for x in response_json["links"] if x["rel"] in ("self", "job"))
+        )
+        return response_json["name"], link
+    except (KeyError, StopIteration):
+        return None
+
+
+def _self_link(collection, default=None):
+    """Finds the self link in a collection, if any"""
+    for link in collection.get("links", []):
+        if link["rel"] == "self":
+            return link["href"]
+    return default
+
+
+def _with_name(fields):
+    """Adds the name to a list of fields, if limited"""
+    if fields is None:
+        return None
+    if isinstance(fields, _string_types):
+        fields = fields.split(",")
+    return list(fields) + ([] if "name" in fields else ["name"])
+
+
+WLSChange = namedtuple("WLSChange", ["kind", "name", "attribute", "old", "new"])
+WLSChange.__doc__ = """
+A change seen when watching an object.
+
+The kind is "added" or "removed" for items, with the item as new or old,
+and "changed" for properties, with the attribute and the old and new value.
+"""
+
+
+def _digests(collection, name):
+    """
+    Maps the names of the items in a collection, or the name of
+    the object if not a collection, to a digest of it and its data.
+    """
+    if "items" in collection:
+        entries = [(itm.get("name"), itm) for itm in collection["items"]]
+    else:
+        entries = [(name, collection)]
+    return OrderedDict(
+        (key, (hash(json.dumps(value, sort_keys=True)), value))
+        for key, value in entries
+    )
+
+
+def _changes(previous, current):
+    """Lists the changes between two results of _digests"""
+    changes = []
+    for name, (digest, value) in current.items():
+        if name not in previous:
+            changes.append(WLSChange("added", name, None, None, value))
+            continue
+        old_digest, old_value = previous[name]
+        # only the entries with a different digest are compared
+        if digest == old_digest:
+            continue
+        for attr in value:
+            if attr == "links" or old_value.get(attr) == value[attr]:
+                continue
+            changes.append(
+                WLSChange("changed", name, attr, old_value.get(attr), value[attr])
+            )
+        for attr in old_value:
+            if attr not in value and attr != "links":
+                changes.append(WLSChange("changed", name, attr, old_value[attr], None))
+    for name, (_, value) in previous.items():
+        if name not in current:
+            changes.append(WLSChange("removed", name, None, value, None))
+    return changes
+
+
+def _prefer(prefer_async, headers=None):
+    if prefer_async:
+        headers = dict(headers or {}, Prefer="respond-async")
+    return headers
+
+
+class WLSUpload(object):
+    """
+    A multipart/form-data body, that is streamed from disk.
+
+    Used as the data of a request, so that large files, e.g.
+    applications, are not read into memory. It can only be sent once.
+
+    :param dict fields: Names of the parts mapped to values that will be
+        sent as JSON, e.g. {"model": {...}}.
+    :param dict files: Names of the parts mapped to paths of files.
+    :param int chunk_size: Number of bytes to read from disk at a time.
+    :param progress: Called with the number of bytes sent so far,
+        and the total, as the body is read.
+    """
+
+    def __init__(self, fields, files, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.boundary = "wls-rest-python-{}".format(uuid.uuid4().hex)
+        self.content_type = "multipart/form-data; boundary={}".format(self.boundary)
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self._progress = progress
+        self._parts = []
+        for name, value in fields.items():
+            self._parts.append(
+                self._header(name, None, "application/json")
+                + json.dumps(value).encode("utf-8")
+                + b"\r\n"
+            )
+        for name, path in files.items():
+            filename = os.path.basename(path)
+            self._parts.append(self._header(name, filename, "application/octet-stream"))
+            self._parts.append(path)
+            self._parts.append(b"\r\n")
+        self._parts.append("--{}--\r\n".format(self.boundary).encode("ascii"))
+        self._length = sum(
+            os.path.getsize(part) if isinstance(part, _string_types) else len(part)
+            for part in self._parts
+        )
+        self._chunks = self._read_parts()
+        self._chunk = b""
+        self._pos = 0
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return "<WLSUpload length={} sent={}>".format(self._length, self.sent)
+
+    def _header(self, name, filename, content_type):
+        disposition = 'form-data; name="{}"'.format(name)
+        if filename is not None:
+            disposition += '; filename="{}"'.format(filename.replace('"', '\\"'))
+        return "--{}\r\nContent-Disposition: {}\r\nContent-Type: {}\r\n\r\n".format(
+            self.boundary, disposition, content_type
+        ).encode("utf-8")
+
+    def _read_parts(self):
+        for part in self._parts:
+            if not isinstance(part, _string_types):
+                yield part
+                continue
+            with open(part, "rb") as fileobj:
+                while True:
+                    chunk = fileobj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def read(self, size=-1):
+        """Reads up to size bytes of the body, or the rest if size is negative"""
+        if size is None or size < 0:
+            size = self._length - self.sent
+        data = []
+        while size > 0:
+            if self._pos >= len(self._chunk):
+                self._chunk = next(self._chunks, b"")
+                self._pos = 0
+                if not self._chunk:
+                    break
+            piece = self._chunk[self._pos : self._pos + size]
+            self._pos += len(piece)
+            size -= len(piece)
+            data.append(piece)
+        data = b"".join(data)
+        self.sent += len(data)
+        if data and self._progress is not None:
+            self._progress(self.sent, self._length)
+        return data
+
+
+def _intern(value):
+    """Interns a string, so that objects with the same name share it"""
+    try:
+        return intern(value)
+    except TypeError:
+        # python 2 can only intern byte strings
+        return value
+
+
+class _Relative(object):
+    """
+    Base for objects with an URL.
+
+    The URL is stored as the object it is relative to, and the rest
+    of the URL, so that the objects in a tree do not each keep a copy
+    of the URL of their parents.
+    """
+
+    __slots__ = ("_base", "_segment")
+
+    def _set_url(self, url, base=None):
+        if base is not None:
+            prefix = base._url + "/"
+            if url.startswith(prefix):
+                self._base = base
+                self._segment = _intern(url[len(prefix) - 1 :])
+                return
+        self._base = None
+        self._segment = url
+
+    @property
+    def _url(self):
+        if self._base is None:
+            return self._segment
+        return self._base._url + self._segment
+
+    @_url.setter
+    def _url(self, url):
+        self._set_url(url)
+
+
+class WLSObject(_Relative):
     """
     Represents all the different WLS objects.
 
     The attributes will differ based on the
     collection used to instantiate it
+
+    If lazy, attribute lookups will not fetch the collection, but
+    return a child object with an URL built from the name of the
+    attribute. The collection is then fetched when the child is used,
+    and if the URL turns out to be wrong, the link is looked up in the
+    parent instead. Properties and actions of lazy objects must be
+    retrieved with item access, e.g. obj["state"] and obj["start"]().
+
+    If projected, property lookups only request the property in question,
+    and the links are only requested if it is not a property.
+
+    If populated, e.g. from a search, the collection is not fetched
+    from the server. The query tells which of the keys are children.
+
+    If seeded, e.g. when created from the items of a collection, the
+    properties are read from the seed, until the object is changed or
+    refreshed. Links, actions and unknown properties are still fetched.
+
+    If templates are given, links and actions are resolved from those
+    seen on other objects of the same type, if possible.
+
+    If base is given, the URL is stored relative to it.
     """
 
-    def __init__(self, name, url, wls):
+    __slots__ = (
+        "_name",
+        "_wls",
+        "_lazy",
+        "_projected",
+        "_parent",
+        "_collection",
+        "_query",
+        "_seed",
+        "_templates",
+        "_links",
+    )
+
+    def __init__(
+        self,
+        name,
+        url,
+        wls,
+        lazy=False,
+        parent=None,
+        projected=False,
+        collection=None,
+        query=None,
+        seed=None,
+        templates=None,
+        base=None,
+    ):
         self._name = name
-        self._url = url
+        self._set_url(url, base)
         self._wls = wls
+        self._lazy = lazy
+        self._projected = projected
+        # only set if the url is built, and not taken from a link
+        self._parent = parent
+        self._collection = collection
+        self._query = query
+        self._seed = seed
+        self._templates = templates
+        # actions and links are expected not to change, so they are kept here
+        self._links = None
+
+    def _child(self, name, url, parent=None, collection=None, query=None, seed=None):
+        return WLSObject(
+            name,
+            url,
+            self._wls,
+            lazy=self._lazy,
+            parent=parent,
+            projected=self._projected,
+            collection=collection,
+            query=query,
+            seed=seed,
+            templates=self._templates,
+            # the seed keeps the self link, so the URL is shared with it instead
+            base=self if seed is None else None,
+        )
+
+    def _item(self, itm):
+        if self._collection is None:
+            self_link = next((x["href"] for x in itm["links"] if x["rel"] == "self"))
+            # the item contains the properties of the child, so no need
+            # to fetch them again
+            return self._child(itm["name"], self_link, seed=itm)
+        # the items of a populated collection is populated as well,
+        # and the children in the query applies to each of them
+        return self._child(
+            itm["name"],
+            _self_link(itm, "{}/{}".format(self._url, quote(itm["name"], safe=""))),
+            collection=itm,
+            query=self._query,
+        )
+
+    def _get_collection(self, **kwargs):
+        if self._collection is not None and not kwargs:
+            return self._collection
+        try:
+            return self._wls.get(self._url, **kwargs)
+        except NotFoundException:
+            if self._parent is None:
+                raise
+            logger.debug("Guessed URL %s not found, looking up link", self._url)
+            link = self._parent._resolve(self._name)
+            if not isinstance(link, WLSObject):
+                raise
+            self._url = link._url
+            self._parent = None
+        return self._wls.get(self._url, **kwargs)
 
     def __dir__(self):
-        attrs = []
-        collection = self._wls.get(self._url)
-        for key in collection:
-            item = collection[key]
-            if key == "links":
-                for link in item:
-                    if link["rel"] == "action":
-                        name = link["title"]
-                    else:
-                        name = link["rel"]
-                    attrs.append(name)
-            elif key == "items":
-                for itm in item:
-                    attrs.append(itm["name"])
-            else:
-                attrs.append(key)
-        return attrs
+        return _attribute_names(self._get_collection())
 
     def __getattr__(self, attr):
         """
@@ -292,85 +1786,203 @@ class WLSObject(object):
 
         We store actions and links for re-use, since they are expected not to change
         """
-        collection = self._wls.get(self._url)
-        for key in collection:
-            item = collection[key]
-            if key == "links":
-                for link in item:
-                    if link["rel"] == "action":
-                        name = link["title"]
-                        if name == attr:
-                            obj = WLSAction(name, link["href"], self._wls)
-                            setattr(self, name, obj)
-                            return obj
-
-                    else:
-                        name = link["rel"]
-                        if name == attr:
-                            obj = WLSObject(name, link["href"], self._wls)
-                            setattr(self, name, obj)
-                            return obj
-
-            elif key == "items":
-                for itm in item:
-                    if itm["name"] == attr:
-                        self_link = next(
-                            (x["href"] for x in itm["links"] if x["rel"] == "self")
-                        )
-                        return WLSObject(itm["name"], self_link, self._wls)
-
-            else:
-                if key == attr:
-                    return item
+        # read once, since other threads might replace it
+        links = self._links
+        if links is not None and attr in links:
+            return links[attr]
+        if self._lazy:
+            if attr.startswith("_"):
+                raise AttributeError(
+                    "'{}' object has no attribute '{}'".format(self._name, attr)
+                )
+            attr = _intern(attr)
+            obj = self._child(
+                attr, "{}/{}".format(self._url, quote(attr, safe="")), parent=self
+            )
+            return self._remember(attr, obj)
+        return self._resolve(attr)
+
+    def _remember(self, attr, obj):
+        # no lock, since a race only creates the same object twice
+        if self._links is None:
+            self._links = {}
+        self._links[attr] = obj
+        return obj
+
+    def _resolve(self, attr):
+        # read once, since other threads might drop them
+        seed = self._seed
+        collection = self._collection
+        if seed is not None and attr in seed:
+            if attr not in ("links", "items"):
+                return seed[attr]
+
+        if self._templates is not None and collection is None:
+            found = self._templates.lookup(self._url, attr)
+            if found is not None:
+                return self._link(attr, *found)
+
+        if collection is not None:
+            children = self._query.get("children", {}) if self._query else {}
+            if attr in children and attr in collection:
+                return self._child(
+                    attr,
+                    _self_link(
+                        collection[attr],
+                        "{}/{}".format(self._url, quote(attr, safe="")),
+                    ),
+                    collection=collection[attr],
+                    query=children[attr],
+                )
+        elif self._projected:
+            # the links and the item names are needed if it is not a property
+            collection = self._get_collection(params=_projection(_with_name([attr])))
+        else:
+            collection = self._get_collection()
+
+        kind, value = _find_attribute(collection, attr)
+        if kind in ("action", "link"):
+            if self._templates is not None:
+                self._templates.store(self._url, attr, kind, value["href"])
+            return self._link(attr, kind, value["href"])
+        if kind == "item":
+            return self._item(value)
+        if kind == "property":
+            return value
 
         raise AttributeError(
             "'{}' object has no attribute '{}'".format(self._name, attr)
         )
 
+    def _link(self, attr, kind, url):
+        # objects of the same type have the same links, so share the names
+        attr = _intern(attr)
+        if kind == "action":
+            obj = WLSAction(attr, url, self._wls, owner=self)
+        else:
+            obj = self._child(attr, url)
+        return self._remember(attr, obj)
+
     def __getitem__(self, key):
         # this is here for items with weird names
         # e.g. webapps with version number (myWebapp#1.2.3)
         try:
-            return self.__getattr__(key)
+            return self._resolve(key)
         except AttributeError:
             pass
         raise KeyError(key)
 
     def __iter__(self):
-        collection = self._wls.get(self._url)
-        is_iterable = False
-        iter_items = []
-        for key in collection:
-            item = collection[key]
-            if key == "items":
-                is_iterable = True
-                for itm in item:
-                    self_link = next(
-                        (x["href"] for x in itm["links"] if x["rel"] == "self")
-                    )
-                    iter_items.append(WLSObject(itm["name"], self_link, self._wls))
-        if is_iterable:
-            return WLSItems(iter_items)
+        collection = self._get_collection()
+        if "items" in collection:
+            return WLSItems(collection["items"], self._item)
 
         raise TypeError("'{}' object is not iterable".format(self._name))
 
     def __len__(self):
-        try:
-            return len(self.__iter__().items)
-        except TypeError:
-            pass
+        # Only the names are needed to count the items
+        if self._collection is None:
+            collection = self._get_collection(
+                params=_projection(fields=["name"], links=[])
+            )
+        else:
+            collection = self._collection
+        if "items" in collection:
+            return len(collection["items"])
 
         raise TypeError("object of type '{}' has no len()".format(self._name))
 
     def __repr__(self):
         return "<WLSObject name='{}' url='{}'>".format(self._name, self._url)
 
+    def stream_items(self, fields=None, exclude_fields=None):
+        """
+        Yields the items of the object as they are received and decoded,
+        instead of after the whole collection is received.
+        Optionally limited to the specified fields.
+        """
+        # the name is needed to create the objects
+        params = _projection(_with_name(fields), exclude_fields)
+        for itm in self._wls.stream_items(self._url, params=params or None):
+            yield self._item(itm)
+
+    def watch(self, interval=5.0, fields=None, max_polls=None):
+        """
+        Polls the object, and yields a WLSChange for each change seen
+        since the previous poll: items added or removed, and properties
+        changed, of the object or of its items.
+
+        Only the fields are requested, without links, and only the items
+        that changed are compared, using a digest of each item.
+
+        :param float interval: Seconds to wait between the polls.
+        :param list fields: The fields to watch, e.g. ["state"]. Default is all.
+        :param int max_polls: Stop after this many polls. Default is to go on.
+        """
+        params = _projection(_with_name(fields), links=[])
+        previous = None
+        polls = 0
+        while True:
+            current = _digests(self._wls.get(self._url, params=params), self._name)
+            if previous is not None:
+                for change in _changes(previous, current):
+                    yield change
+            previous = current
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            time.sleep(interval)
+
+    def fetch(self, fields=None, exclude_fields=None, links=None, exclude_links=None):
+        """
+        Retrieves the collection of the object, optionally
+        limited to the specified fields and links.
+
+        Returns the decoded JSON.
+        """
+        params = _projection(fields, exclude_fields, links, exclude_links)
+        if params:
+            return self._get_collection(params=params)
+        return self._get_collection()
+
+    def search(self, query):
+        """
+        Searches the tree below this object, with a query like
+        {"fields": [...], "links": [...], "children": {...}}.
+        Only available on the roots of the trees, e.g. domainRuntime.
+
+        Returns a populated WLSObject, which can be navigated without
+        more requests.
+        """
+        collection = self._wls._search("{}/search".format(self._url), query)
+        return self._child(self._name, self._url, collection=collection, query=query)
+
+    def snapshot(self, depth=0):
+        """
+        Takes a snapshot of the object, and of the objects below it
+        down to the depth. See WLS.snapshot.
+        """
+        return self._wls.snapshot(self, depth)
+
+    def refresh(self):
+        """
+        Drops the seeded and populated data, so that
+        the properties are fetched from the server again.
+
+        Returns the object itself.
+        """
+        self._seed = None
+        self._collection = None
+        self._query = None
+        return self
+
     def delete(self, prefer_async=False, **kwargs):
         """
         Deletes the resource. Will result in an DELETE request to the self url
 
         The kwargs are sendt through to requests
         """
+        self._seed = None
         return self._wls.delete(self._url, prefer_async, **kwargs)
 
     def create(self, prefer_async=False, **kwargs):
@@ -379,6 +1991,7 @@ class WLSObject(object):
 
         The kwargs are sendt through to requests
         """
+        self._seed = None
         return self._wls.post(self._url, prefer_async, **kwargs)
 
     def update(self, prefer_async=False, **kwargs):
@@ -387,48 +2000,362 @@ class WLSObject(object):
 
         The kwargs will be sent as json
         """
+        self._seed = None
         return self._wls.post(self._url, prefer_async, json=kwargs)
 
+    def deploy(
+        self,
+        model,
+        source,
+        plan=None,
+        prefer_async=False,
+        progress=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Deploys an application, e.g. to edit.appDeployments, by uploading it.
+
+        The files are streamed from disk, instead of being read into memory.
+
+        :param dict model: The deployment, e.g. {"name": ..., "targets": [...]}
+        :param string source: Path to the application.
+        :param string plan: Path to the deployment plan, if any.
+        :param bool prefer_async: Return a job instead of waiting for the deployment.
+        :param progress: Called with the number of bytes sent so far, and the total.
+        :param int chunk_size: Number of bytes to read from disk at a time.
+        """
+        files = OrderedDict([("sourcePath", source)])
+        if plan is not None:
+            files["planPath"] = plan
+        upload = WLSUpload({"model": model}, files, chunk_size, progress)
+        return self.create(
+            prefer_async,
+            data=upload,
+            headers={"Content-Type": upload.content_type},
+        )
+
 
 class WLSItems(object):
     """
     Items from an object.
 
-    Used as an iterator
+    Used as an iterator. The objects are created from the items
+    with the factory when they are needed, so that e.g. stopping
+    early or slicing does not create the rest of them.
     """
 
-    def __init__(self, items):
-        self.items = items
+    __slots__ = ("_items", "_factory", "counter")
+
+    def __init__(self, items, factory=None):
+        self._items = items
+        self._factory = factory
         self.counter = 0
 
+    @property
+    def items(self):
+        """All the items, as objects"""
+        return [self._create(item) for item in self._items]
+
+    def _create(self, item):
+        return item if self._factory is None else self._factory(item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return WLSItems(self._items[index], self._factory)
+        return self._create(self._items[index])
+
     def __next__(self):
         try:
-            item = self.items[self.counter]
+            item = self._items[self.counter]
         except IndexError:
             raise StopIteration
 
         self.counter += 1
-        return item
+        return self._create(item)
 
     def next(self):
         # python 2
         return self.__next__()
 
+    def __iter__(self):
+        return self
+
+    def map(self, fn, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Calls fn with each of the items, concurrently in a pool of threads.
+
+        Returns the results in the same order as the items. If a call
+        raised an exception, the exception is returned in its place.
+        """
+
+        def call(item):
+            return fn(self._create(item))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(call, item) for item in self._items]
 
-class WLSAction(object):
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as error:
+                results.append(error)
+        return results
+
+    def invoke(
+        self, action, prefer_async=False, concurrency=DEFAULT_MAX_WORKERS, **kwargs
+    ):
+        """
+        Invokes an action on each of the items, concurrently.
+
+        The kwargs are sent as json to the action. Returns the results in
+        the same order as the items, with exceptions in place of failed calls.
+        """
+
+        def call(item):
+            return item[action](prefer_async=prefer_async, **kwargs)
+
+        return self.map(call, max_workers=concurrency)
+
+
+class WLSAction(_Relative):
     """
     An action from a collection.
 
-    Identified by a link with rel=action.
+    Identified by a link with rel=action. Calling it drops the seeded
+    properties of the object it belongs to, since they might change.
     """
 
-    def __init__(self, name, url, wls):
-        self._url = url
+    __slots__ = ("_name", "_wls", "_owner")
+
+    def __init__(self, name, url, wls, owner=None):
+        self._set_url(url, owner)
         self._name = name
         self._wls = wls
+        self._owner = owner
 
     def __repr__(self):
         return "<WLSAction name='{}' url='{}'>".format(self._name, self._url)
 
     def __call__(self, prefer_async=False, **kwargs):
+        if self._owner is not None:
+            self._owner._seed = None
         return self._wls.post(self._url, prefer_async, json=kwargs if kwargs else {})
+
+
+def _child_links(collection, url):
+    """
+    Lists the names and URLs of the links to the children of an object,
+    i.e. the links below its own URL, that are not actions.
+    """
+    prefix = url.rstrip("/") + "/"
+    return [
+        (link["rel"], link["href"])
+        for link in collection.get("links", [])
+        if link["rel"] != "action" and link["href"].startswith(prefix)
+    ]
+
+
+class WLSSnapshot(object):
+    """
+    A read-only view of an object, as it was when the snapshot was taken.
+
+    The properties, items and the links that were fetched are available
+    as with WLSObject, but without sending any requests. Actions are not.
+    Created with WLSObject.snapshot() or WLS.snapshot().
+    """
+
+    __slots__ = ("_name", "_url", "_collection", "_links", "_items")
+
+    def __init__(self, name, url, collection):
+        set_attr = super(WLSSnapshot, self).__setattr__
+        set_attr("_name", name)
+        set_attr("_url", url)
+        set_attr("_collection", collection)
+        set_attr("_links", OrderedDict())
+        set_attr(
+            "_items",
+            OrderedDict(
+                (itm["name"], WLSSnapshot(itm["name"], _self_link(itm, url), itm))
+                for itm in collection.get("items", [])
+            ),
+        )
+
+    def __repr__(self):
+        return "<WLSSnapshot name='{}' url='{}'>".format(self._name, self._url)
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("'{}' snapshot is read-only".format(self._name))
+
+    def __delattr__(self, attr):
+        raise AttributeError("'{}' snapshot is read-only".format(self._name))
+
+    def __dir__(self):
+        properties = [key for key in self._collection if key not in ("links", "items")]
+        return properties + list(self._links) + list(self._items)
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        if attr in self._links:
+            return self._links[attr]
+        if attr in self._collection and attr not in ("links", "items"):
+            return self._collection[attr]
+        if attr in self._items:
+            return self._items[attr]
+        raise AttributeError(
+            "'{}' snapshot has no attribute '{}'".format(self._name, attr)
+        )
+
+    def __getitem__(self, key):
+        try:
+            return self.__getattr__(key)
+        except AttributeError:
+            pass
+        raise KeyError(key)
+
+    def __iter__(self):
+        if "items" not in self._collection:
+            raise TypeError("'{}' snapshot is not iterable".format(self._name))
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        if "items" not in self._collection:
+            raise TypeError("snapshot of type '{}' has no len()".format(self._name))
+        return len(self._items)
+
+    def _children(self):
+        # the links, and the items, which only have their properties so far
+        children = [
+            ("link", name, url)
+            for name, url in _child_links(self._collection, self._url)
+        ]
+        children += [("item", name, item._url) for name, item in self._items.items()]
+        return children
+
+    def _add(self, kind, name, snapshot):
+        if kind == "link":
+            self._links[name] = snapshot
+        else:
+            self._items[name] = snapshot
+
+
+class WLSFleet(object):
+    """
+    Represents many WLS REST servers, e.g. the admin servers of many domains.
+
+    The servers are initialized concurrently, and the operations on them
+    share a bounded pool of threads. Servers that fails to initialize are
+    available in the errors attribute, and their exception is returned
+    in place of the results from them.
+
+    :param domains: Either a dict with the name of each domain mapped to a
+        dict with the arguments to WLS, or a list of hosts.
+    :param int max_workers: Maximum number of servers to operate on concurrently.
+    :param kwargs: Arguments to WLS that are common for all the domains,
+        e.g. username, password and pool_maxsize.
+    """
+
+    def __init__(self, domains, max_workers=DEFAULT_MAX_WORKERS, **kwargs):
+        if not isinstance(domains, dict):
+            domains = OrderedDict((host, {"host": host}) for host in domains)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._names = list(domains)
+        self.servers = OrderedDict()
+        self.errors = OrderedDict()
+
+        futures = OrderedDict(
+            (name, self._executor.submit(WLS, **dict(kwargs, **args)))
+            for name, args in domains.items()
+        )
+        for name, future in futures.items():
+            try:
+                self.servers[name] = future.result()
+            except Exception as error:
+                logger.warning("Could not initialize %s: %s", name, error)
+                self.errors[name] = error
+
+    def __repr__(self):
+        return "<WLSFleet servers={} errors={}>".format(
+            len(self.servers), len(self.errors)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shuts down the pool of threads and closes the sessions"""
+        self._executor.shutdown()
+        for wls in self.servers.values():
+            wls.close()
+
+    def map(self, fn):
+        """
+        Calls fn with the WLS of each domain, concurrently.
+
+        Returns a dict with the name of each domain mapped to the result,
+        or to the exception if the call (or the initialization) failed.
+        """
+        futures = OrderedDict(
+            (name, self._executor.submit(fn, wls)) for name, wls in self.servers.items()
+        )
+        results = OrderedDict()
+        for name in self._names:
+            if name in self.errors:
+                results[name] = self.errors[name]
+                continue
+            try:
+                results[name] = futures[name].result()
+            except Exception as error:
+                results[name] = error
+        return results
+
+    def health(self):
+        """
+        Retrieves the state and health of the running servers in each domain,
+        with one request per domain.
+
+        Returns a dict with the name of each domain mapped to a list of
+        the servers, or to the exception if the request failed.
+        """
+
+        def check(wls):
+            collection = wls.get(
+                "{}/domainRuntime/serverRuntimes".format(wls.base_url),
+                params=_projection(fields=["name", "state", "healthState"], links=[]),
+            )
+            return collection["items"]
+
+        return self.map(check)
+
+    def deploy(self, model, source, plan=None, prefer_async=False, progress=None):
+        """
+        Deploys an application to each domain, concurrently.
+        The files are read from disk once per domain.
+
+        The progress is called with the name of the domain, the number
+        of bytes sent so far to it, and the total. Returns a dict with
+        the name of each domain mapped to the result, e.g. the job
+        if prefer_async, or to the exception if the deployment failed.
+        """
+        names = dict((id(wls), name) for name, wls in self.servers.items())
+
+        def deploy(wls):
+            report = None
+            if progress is not None:
+                name = names[id(wls)]
+
+                def report(sent, total):
+                    progress(name, sent, total)
+
+            return wls.edit.appDeployments.deploy(
+                model, source, plan, prefer_async=prefer_async, progress=report
+            )
+
+        return self.map(deploy)
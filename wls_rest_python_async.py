@@ -0,0 +1,380 @@
+"""
+An asyncio client for the Weblogic Server REST API.
+
+Mirrors WLS, WLSObject and WLSAction from wls_rest_python,
+but all requests are awaitable. Requires aiohttp.
+
+https://github.com/magnuswatn/wls-rest-python
+"""
+import asyncio
+import base64
+import json
+import logging
+from collections import deque
+
+import aiohttp
+
+from wls_rest_python import (
+    DEFAULT_TIMEOUT,
+    WLS,
+    __version__,
+    _attribute_names,
+    _changes,
+    _digests,
+    _find_attribute,
+    _prefer,
+    _projection,
+    _response_link,
+    _with_name,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _Response(object):
+    """
+    A read response, with the interface WLS._handle_error expects
+    """
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncWLS(object):
+    """
+    Represents a WLS REST server, with asyncio.
+
+    Must be connected before use, either by awaiting connect(),
+    or by using it as an async context manager.
+
+    :param string host: protocol://hostname:port of the server.
+    :param string username: Username used to authenticate against the server
+    :param string password: Password used to authenticate against the server
+    :param string version: Version of the rest interface to use. Defaults to "latest"
+    :param bool verify: Whether to verify certificates on SSL connections.
+    :param float timeout: The timeout value to use, in seconds. Default is 305.
+    :param int limit: Maximum number of simultaneous connections. Default is 100.
+    """
+
+    def __init__(
+        self,
+        host,
+        username,
+        password,
+        version="latest",
+        verify=True,
+        timeout=DEFAULT_TIMEOUT,
+        limit=100,
+    ):
+        # the session must be created inside the event loop,
+        # so it is done on the first request
+        self.session = None
+        self.username = username
+        self.verify = verify
+        self.timeout = timeout
+        self.limit = limit
+        self._password = password
+        self.base_url = "{}/management/weblogic/{}".format(host, version)
+        self.version = None
+
+    async def __aenter__(self):
+        try:
+            await self.connect()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __repr__(self):
+        return "<AsyncWLS url='{}' username='{}' version='{}'>".format(
+            self.base_url, self.username, self.version
+        )
+
+    async def connect(self):
+        """
+        Retrieves the root collection, with the version and the trees
+        """
+        collection = await self.get(self.base_url)
+        self.version = collection["version"]
+        self.isLatest = collection["isLatest"]
+        self.lifecycle = collection["lifecycle"]
+        for link in collection["links"]:
+            link_obj = AsyncWLSObject(link["rel"], link["href"], self)
+            setattr(self, link["rel"], link_obj)
+
+    async def close(self):
+        """Closes the underlying session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _create_session(self):
+        user_agent = "wls-rest-python {} (aiohttp/{})".format(
+            __version__, aiohttp.__version__
+        )
+        credentials = "{}:{}".format(self.username, self._password).encode("utf-8")
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                ssl=None if self.verify else False, limit=self.limit
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={
+                "Accept": "application/json",
+                "Authorization": "Basic {}".format(
+                    base64.b64encode(credentials).decode("ascii")
+                ),
+                "User-Agent": user_agent,
+                "X-Requested-By": user_agent,
+            },
+        )
+
+    async def get(self, url, **kwargs):
+        """
+        Does a GET request to the specified URL.
+
+        Returns the decoded JSON.
+        """
+        return await self._request("GET", url, **kwargs)
+
+    async def post(self, url, prefer_async=False, **kwargs):
+        """
+        Does a POST request to the specified URL.
+
+        If the response is a job or an collection, it will return an
+        AsyncWLSObject. Otherwise it will return the decoded JSON
+        """
+        return await self._request("POST", url, prefer_async, **kwargs)
+
+    async def delete(self, url, prefer_async=False, **kwargs):
+        """
+        Does a DELETE request to the specified URL.
+
+        If the response is a job or an collection, it will return an
+        AsyncWLSObject. Otherwise it will return the decoded JSON
+        """
+        return await self._request("DELETE", url, prefer_async, **kwargs)
+
+    async def _request(self, method, url, prefer_async=False, **kwargs):
+        if self.session is None:
+            self.session = self._create_session()
+        headers = _prefer(prefer_async, kwargs.pop("headers", None))
+        async with self.session.request(
+            method, url, headers=headers, **kwargs
+        ) as response:
+            content = await response.read()
+            status = response.status
+        logger.debug("Sent %s request to %s, got HTTP %s", method, url, status)
+        return self._handle_response(method, _Response(status, content))
+
+    def _handle_response(self, method, response):
+        if response.status_code >= 400:
+            WLS._handle_error(response)
+
+        # GET is used by the AsyncWLSObject to retrieve the collection
+        # so it must return only the decoded JSON, not an AsyncWLSObject
+        if method == "GET":
+            return response.json()
+
+        response_json = response.json() if response.content else None
+        if not response_json:
+            return None
+
+        found = _response_link(response_json)
+        if found is None:
+            return response_json
+
+        name, link = found
+        return AsyncWLSObject(name, link, self)
+
+
+class AsyncWLSObject(object):
+    """
+    Represents all the different WLS objects, with asyncio.
+
+    Since attribute lookups can not be awaited, the properties,
+    links, actions and items are retrieved with aget().
+    """
+
+    def __init__(self, name, url, wls):
+        self._name = name
+        self._url = url
+        self._wls = wls
+        # actions and links are expected not to change
+        self._links = {}
+
+    def __repr__(self):
+        return "<AsyncWLSObject name='{}' url='{}'>".format(self._name, self._url)
+
+    def __aiter__(self):
+        return AsyncWLSItems(self)
+
+    async def aget(self, attr):
+        """
+        Retrieves a property, link, action or item from the collection
+        """
+        try:
+            return self._links[attr]
+        except KeyError:
+            pass
+
+        collection = await self._wls.get(self._url)
+        kind, value = _find_attribute(collection, attr)
+        if kind == "action":
+            obj = self._links[attr] = AsyncWLSAction(attr, value["href"], self._wls)
+            return obj
+        if kind == "link":
+            obj = self._links[attr] = AsyncWLSObject(attr, value["href"], self._wls)
+            return obj
+        if kind == "item":
+            return self._item(value)
+        if kind == "property":
+            return value
+
+        raise AttributeError(
+            "'{}' object has no attribute '{}'".format(self._name, attr)
+        )
+
+    async def adir(self):
+        """Lists the properties, links, actions and items of the object"""
+        return _attribute_names(await self._wls.get(self._url))
+
+    async def aitems(self):
+        """Retrieves the items of the object, as a list of AsyncWLSObjects"""
+        collection = await self._wls.get(self._url)
+        if "items" not in collection:
+            raise TypeError("'{}' object is not iterable".format(self._name))
+        return [self._item(itm) for itm in collection["items"]]
+
+    async def alen(self):
+        """Counts the items of the object"""
+        collection = await self._wls.get(self._url)
+        if "items" not in collection:
+            raise TypeError("object of type '{}' has no len()".format(self._name))
+        return len(collection["items"])
+
+    def _item(self, itm):
+        self_link = next((x["href"] for x in itm["links"] if x["rel"] == "self"))
+        return AsyncWLSObject(itm["name"], self_link, self._wls)
+
+    def watch(self, interval=5.0, fields=None, max_polls=None):
+        """
+        Polls the object, and yields a WLSChange for each change seen since
+        the previous poll, as an async iterator. See WLSObject.watch.
+        """
+        params = _projection(_with_name(fields), links=[])
+        return AsyncWLSWatch(self, interval, params, max_polls)
+
+    async def delete(self, prefer_async=False, **kwargs):
+        """
+        Deletes the resource. Will result in an DELETE request to the self url
+
+        The kwargs are sendt through to aiohttp
+        """
+        return await self._wls.delete(self._url, prefer_async, **kwargs)
+
+    async def create(self, prefer_async=False, **kwargs):
+        """
+        Creates a resource. Will result in an POST request to the self url
+
+        The kwargs are sendt through to aiohttp
+        """
+        return await self._wls.post(self._url, prefer_async, **kwargs)
+
+    async def update(self, prefer_async=False, **kwargs):
+        """
+        Updates an property of the resource.
+
+        The kwargs will be sent as json
+        """
+        return await self._wls.post(self._url, prefer_async, json=kwargs)
+
+
+class AsyncWLSItems(object):
+    """
+    Items from an object, as an async iterator.
+
+    The collection is fetched on the first iteration.
+    """
+
+    def __init__(self, obj):
+        self._obj = obj
+        self.items = None
+        self.counter = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.items is None:
+            self.items = await self._obj.aitems()
+        try:
+            item = self.items[self.counter]
+        except IndexError:
+            raise StopAsyncIteration
+
+        self.counter += 1
+        return item
+
+
+class AsyncWLSWatch(object):
+    """
+    Changes of an object, as an async iterator.
+
+    The object is polled until there are changes to return.
+    """
+
+    def __init__(self, obj, interval, params, max_polls=None):
+        self._obj = obj
+        self.interval = interval
+        self.params = params
+        self.max_polls = max_polls
+        self.polls = 0
+        self._previous = None
+        self._pending = deque()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._pending:
+            if self.max_polls is not None and self.polls >= self.max_polls:
+                raise StopAsyncIteration
+            if self.polls:
+                await asyncio.sleep(self.interval)
+            collection = await self._obj._wls.get(self._obj._url, params=self.params)
+            current = _digests(collection, self._obj._name)
+            if self._previous is not None:
+                self._pending.extend(_changes(self._previous, current))
+            self._previous = current
+            self.polls += 1
+        return self._pending.popleft()
+
+
+class AsyncWLSAction(object):
+    """
+    An action from a collection, with asyncio.
+
+    Identified by a link with rel=action. Calling it returns an awaitable.
+    """
+
+    def __init__(self, name, url, wls):
+        self._url = url
+        self._name = name
+        self._wls = wls
+
+    def __repr__(self):
+        return "<AsyncWLSAction name='{}' url='{}'>".format(self._name, self._url)
+
+    def __call__(self, prefer_async=False, **kwargs):
+        return self._wls.post(self._url, prefer_async, json=kwargs if kwargs else {})